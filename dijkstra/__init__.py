@@ -0,0 +1,137 @@
+'''
+Assignment 2 - Eric Anderson
+
+Revision
+
+1. The definition of the shortest path between two vertices in a weighted
+graph is the path that has the lowest cost between the two vertices.
+
+2. The main steps in Dijkstra's algorithm are the following:
+a. Choose a starting vertex
+b. Pick another open vertex adjacent to the starting vertex
+that has the smallest cost
+c. expand from that vertex to all of its neighbors that are not closed
+d. for each neighbor that we reached, the cost of the edge to the neighbor is
+added onto the cost for the vertex to get a new path cost for the neighbor.
+e. If the path cost is lower than the previous one, or neighbor is new, update
+the neighbors path cost
+f. close the current vertex.
+g. Repeat b-f until all vertices are closed
+
+3. An adaptable priority queue is a queue where the priority of its elements
+undergo changes. We would use it in Dijkstra's algorithm by using it to store all open
+vertices, giving priority to the vertices with the lowest cost. The APQ
+implementation would be best for use in Dijkstra in application to standard
+road maps would be the heap APQ implementation.
+
+Usage:
+    python -m dijkstra GRAPH [SOURCE [TARGET]] [--stdin]
+    python -m dijkstra.benchmark --help
+
+Importing the package is cheap: each sub-module is only imported the first
+time one of its names is used, e.g. dijkstra.Graph imports dijkstra.graph.
+'''
+import importlib
+
+# The sub-module each public name is defined in
+_EXPORTS = {
+    # Vertex, edge and graph classes
+    'Vertex': 'graph',
+    'Edge': 'graph',
+    'Graph': 'graph',
+    # Priority queues
+    'Element': 'queues',
+    'AdaptablePriorityQueue': 'queues',
+    'HeapqQueue': 'queues',
+    'DaryHeap': 'queues',
+    'BucketQueue': 'queues',
+    'QUEUE_BACKENDS': 'queues',
+    'make_queue': 'queues',
+    # Searches on Graph objects
+    'SearchStats': 'search',
+    'Dijkstra': 'search',
+    'AStar': 'search',
+    'euclidean_heuristic': 'search',
+    'EARTH_RADIUS': 'search',
+    'haversine_heuristic': 'search',
+    'BidirectionalDijkstra': 'search',
+    'shortest_path': 'search',
+    'path_to': 'search',
+    'print_path': 'search',
+    # Compact (CSR) graphs and their binary files
+    'CompactGraph': 'compact',
+    'CompactGraphBuilder': 'compact',
+    'compact_path': 'compact',
+    'GRAPH_FILE_MAGIC': 'compact',
+    'GRAPH_FILE_VERSION': 'compact',
+    'save_compact_graph': 'compact',
+    'load_compact_graph': 'compact',
+    'compact_dijkstra': 'compact',
+    # Contraction hierarchies
+    'ContractionHierarchy': 'ch',
+    'CH_FILE_MAGIC': 'ch',
+    'CH_FILE_VERSION': 'ch',
+    # Landmark (ALT) heuristics
+    'LandmarkIndex': 'landmarks',
+    'LANDMARK_FILE_MAGIC': 'landmarks',
+    'LANDMARK_FILE_VERSION': 'landmarks',
+    # Partitions into cells
+    'GraphPartition': 'partition',
+    # Many sources at once
+    'batch_dijkstra': 'batch',
+    'distance_matrix': 'batch',
+    # Caching
+    'ShortestPathCache': 'cache',
+    # Dynamic shortest paths
+    'DynamicShortestPaths': 'dynamic',
+    'DynamicShortestPathTrees': 'dynamic',
+    # Asyncio routing service
+    'RoutingService': 'service',
+    'RoutingClient': 'service',
+    # Reading route map files
+    'read_graph_records': 'reader',
+    'print_progress': 'reader',
+    'graphreader': 'reader',
+    # Benchmarks
+    'grid_graph': 'benchmark',
+    'benchmark_dijkstra': 'benchmark',
+    'write_graph_file': 'benchmark',
+    'grid_graph_records': 'benchmark',
+    'geometric_graph_records': 'benchmark',
+    'scale_free_graph_records': 'benchmark',
+    'BENCHMARK_GENERATORS': 'benchmark',
+    'run_benchmarks': 'benchmark',
+    'memory_footprint': 'benchmark',
+}
+
+# The sub-modules themselves, which can also be used as attributes
+_SUBMODULES = ('batch', 'benchmark', 'cache', 'ch', 'compact', 'dynamic',
+               'graph', 'landmarks', 'partition', 'queues', 'reader', 'search',
+               'service')
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    """ Return the public name, importing the sub-module it is defined in.
+
+    The value is then stored in the package, so that this is only called
+    once per name.
+
+    Args:
+        name - the attribute being looked up
+    """
+    if name in _EXPORTS:
+        module = importlib.import_module('.' + _EXPORTS[name], __name__)
+        value = getattr(module, name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """ Return the package's names, including the ones not yet imported. """
+    return sorted(set(globals()) | set(_EXPORTS) | set(_SUBMODULES))
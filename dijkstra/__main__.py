@@ -0,0 +1,198 @@
+'''
+Command line interface: shortest paths in a route map file.
+
+    python -m dijkstra GRAPH SOURCE           all shortest paths from SOURCE
+    python -m dijkstra GRAPH SOURCE TARGET    the shortest path to TARGET
+    python -m dijkstra GRAPH --stdin          "SOURCE TARGET" queries, one
+                                              per line of standard input
+
+GRAPH is a route map file (Node and Edge records), or a binary graph file
+written by save_compact_graph, which is memory-mapped instead of parsed.
+The graph is loaded once, however many queries follow.
+'''
+import argparse
+import sys
+
+from .compact import GRAPH_FILE_MAGIC, CompactGraph, compact_dijkstra, \
+    compact_path, load_compact_graph
+from .cache import ShortestPathCache
+from .reader import graphreader
+from .search import Dijkstra, path_to, print_path
+
+
+def load_graph(filename):
+    """ Return the graph in filename, a route map or a binary graph file.
+
+    Args:
+        filename - the name of the file
+    """
+    with open(filename, 'rb') as file:
+        magic = file.read(len(GRAPH_FILE_MAGIC))
+    if magic == GRAPH_FILE_MAGIC:
+        return load_compact_graph(filename)
+    return graphreader(filename, progress=None, verbose=False)
+
+
+def print_tree(graph, source):
+    """ Print the shortest path tree from the vertex labelled source.
+
+    Each line is: (Vertex) -> ((Vertex Path Cost), (Previous Vertex))
+
+    Args:
+        graph - a Graph or CompactGraph
+        source - the label of the start vertex
+    """
+    print("Shortest paths starting from vertex %s" % source)
+    print("Format is: (Vertex) -> ((Vertex Path Cost), (Previous Vertex)")
+    if isinstance(graph, CompactGraph):
+        s = _vertex(graph, source)
+        dist, preds = compact_dijkstra(graph, s)
+        for i in range(graph.num_vertices()):
+            if preds[i] >= 0:
+                print('%s -> (%s, %s)' % (graph.label(i), dist[i],
+                                          graph.label(preds[i])))
+            elif i == s:
+                print('%s -> Starting Vertex' % graph.label(i))
+    else:
+        print_path(Dijkstra(graph, _vertex(graph, source)))
+
+
+class QueryAnswerer:
+    """ Answers point to point queries on one graph, by vertex label.
+
+    On a Graph, whole shortest path trees are cached by source, so a
+    stream of queries from a few sources only searches once per source.
+    """
+
+    def __init__(self, graph):
+        """ Create an answerer for graph, a Graph or CompactGraph. """
+        self._graph = graph
+        if isinstance(graph, CompactGraph):
+            self._cache = None
+        else:
+            self._cache = ShortestPathCache(graph)
+
+    def query(self, source, target):
+        """ Return (cost, path) from label source to label target.
+
+        path is the list of vertex labels, or None (and cost is inf) if
+        target cannot be reached. Raises KeyError for an unknown label.
+
+        Args:
+            source - the label of the start vertex
+            target - the label of the target vertex
+        """
+        s = _vertex(self._graph, source)
+        t = _vertex(self._graph, target)
+        if self._cache is not None:
+            # the whole tree from s, so later queries from s reuse it
+            cost, path = path_to(self._cache.dijkstra(s), t)
+            if path is None:
+                return cost, None
+            return cost, [v.element() for v in path]
+        dist, preds = compact_dijkstra(self._graph, s, target=t)
+        path = compact_path(dist, preds, t)
+        if path is None:
+            return dist[t], None
+        return dist[t], [self._graph.label(i) for i in path]
+
+
+def format_route(source, target, cost, path):
+    """ Return one line describing the answer to a query. """
+    if path is None:
+        return '%s -> %s : no path' % (source, target)
+    return ' -> '.join(str(x) for x in path) + ' : ' + str(cost)
+
+
+def _vertex(graph, label):
+    """ Return the vertex (or vertex id) of graph with label.
+
+    Raises KeyError if there is no such vertex.
+    """
+    if isinstance(graph, CompactGraph):
+        vertex = graph.vertex_id(label)
+    else:
+        vertex = graph.get_vertex_by_label(label)
+    if vertex is None:
+        raise KeyError('no vertex %s' % label)
+    return vertex
+
+
+def _message(error):
+    """ Return the message of error, without the quotes KeyError adds. """
+    if isinstance(error, KeyError) and error.args:
+        return str(error.args[0])
+    return str(error)
+
+
+def answer_stream(answerer, lines, out=None, err=None):
+    """ Answer a "SOURCE TARGET" query for each line, writing one line each.
+
+    Blank lines and lines starting with # are skipped. A bad query is
+    reported on err, and the stream carries on. Returns the number of bad
+    queries.
+
+    Args:
+        answerer - a QueryAnswerer
+        lines - an iterable of query lines, such as sys.stdin
+        out - where to write the answers (default: sys.stdout)
+        err - where to report bad queries (default: sys.stderr)
+    """
+    out = out or sys.stdout
+    err = err or sys.stderr
+    errors = 0
+    for number, line in enumerate(lines, 1):
+        fields = line.split()
+        if not fields or fields[0].startswith('#'):
+            continue
+        try:
+            if len(fields) != 2:
+                raise ValueError('expected "SOURCE TARGET"')
+            source, target = int(fields[0]), int(fields[1])
+            cost, path = answerer.query(source, target)
+        except (KeyError, ValueError) as error:
+            errors += 1
+            err.write('line %d: %s\n' % (number, _message(error)))
+            continue
+        out.write(format_route(source, target, cost, path) + '\n')
+        out.flush()
+    return errors
+
+
+def main(argv=None):
+    """ Run the command line interface. Returns the exit code.
+
+    Args:
+        argv - the arguments, not including the program name (default:
+               sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m dijkstra',
+        description='Shortest paths in a route map, with Dijkstra.')
+    parser.add_argument('graph', help='a route map or binary graph file')
+    parser.add_argument('source', nargs='?', type=int,
+                        help='the label of the start vertex')
+    parser.add_argument('target', nargs='?', type=int,
+                        help='the label of the target vertex')
+    parser.add_argument('--stdin', action='store_true',
+                        help='read "SOURCE TARGET" queries from stdin')
+    args = parser.parse_args(argv)
+    if args.stdin == (args.source is not None):
+        parser.error('give either SOURCE (and TARGET) or --stdin')
+
+    graph = load_graph(args.graph)
+    if args.stdin:
+        return 1 if answer_stream(QueryAnswerer(graph), sys.stdin) else 0
+    try:
+        if args.target is None:
+            print_tree(graph, args.source)
+        else:
+            cost, path = QueryAnswerer(graph).query(args.source, args.target)
+            print(format_route(args.source, args.target, cost, path))
+    except KeyError as error:
+        parser.exit(1, 'error: %s\n' % _message(error))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+'''
+Shortest paths from many sources at once, across a pool of processes.
+'''
+from array import array
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+# NumPy is optional, and only used to return distance matrices as arrays
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .compact import CompactGraph, compact_dijkstra
+from .queues import Element
+
+# Shortest paths from many sources at once, across a pool of processes
+
+# The graph searched by the current worker process, set once per worker by
+# _init_batch_worker so that it is not sent again with every task
+_batch_graph = None
+
+def _init_batch_worker(graph):
+    """ Keep graph as the graph searched by this worker process. """
+    global _batch_graph
+    _batch_graph = graph
+
+def _batch_worker(task):
+    """ Return the compact_dijkstra results for a chunk of source ids.
+
+    Args:
+        task - (sources, settle_order): the chunk of source ids, and True
+               to add the ids in the order they were closed to each
+               (dist, preds) result
+    """
+    sources, settle_order = task
+    if not settle_order:
+        return [compact_dijkstra(_batch_graph, source) for source in sources]
+    results = []
+    for source in sources:
+        order = array('q')
+        dist, preds = compact_dijkstra(_batch_graph, source, order=order)
+        results.append((dist, preds, order))
+    return results
+
+def batch_dijkstra(graph, sources, max_workers=None, chunksize=8,
+                   matrix=False):
+    """ Return the shortest paths from each of many sources.
+
+    The sources are split into chunks and searched in parallel by a pool of
+    worker processes. The graph is handed to each worker once, when it
+    starts (and a memory-mapped CompactGraph is only sent as its file name,
+    so every worker maps the same pages), rather than with every task.
+
+    Args:
+        graph - a Graph, or a CompactGraph
+        sources - the start vertices, or vertex ids for a CompactGraph
+        max_workers - the number of worker processes (default: one per
+                      CPU). With 1, the searches run in this process.
+        chunksize - the number of sources sent to a worker at a time
+        matrix - if True, return the distance rows rather than the paths
+
+    Returns a list with one result per source, in order. For a Graph each
+    result is a read-only closed dictionary, like the one returned by
+    Dijkstra, whose entries are only made when they are looked up; for a
+    CompactGraph it is a (dist, preds) pair, as returned by
+    compact_dijkstra. If matrix is True, each result is just the dist
+    array, indexed by vertex id (in graph.vertices() order for a Graph).
+    """
+    if isinstance(graph, CompactGraph):
+        compact = graph
+        vertices = None
+        ids = list(sources)
+    else:
+        compact = CompactGraph.from_graph(graph)
+        vertices = graph.vertices()
+        index = {v: i for i, v in enumerate(vertices)}
+        ids = [index[v] for v in sources]
+    # closed dictionaries iterate in the order the vertices were closed,
+    # which the workers record as they search
+    settle_order = vertices is not None and not matrix
+    chunks = [(ids[i:i + chunksize], settle_order)
+              for i in range(0, len(ids), chunksize)]
+    if max_workers == 1:
+        _init_batch_worker(compact)
+        results = [_batch_worker(chunk) for chunk in chunks]
+        _init_batch_worker(None)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_batch_worker,
+                                 initargs=(compact,)) as pool:
+            results = list(pool.map(_batch_worker, chunks))
+    results = [result for chunk in results for result in chunk]
+    if matrix:
+        return [result[0] for result in results]
+    if vertices is None:
+        return results
+    return [_ClosedArrays(vertices, index, dist, preds, order)
+            for (dist, preds, order) in results]
+
+class _ClosedArrays(Mapping):
+    """ A Dijkstra closed dictionary, read from compact_dijkstra arrays.
+
+    Building a real dictionary, with an Element for every vertex, takes
+    longer than the search itself, and has to be done here rather than in
+    the workers (whose vertices are copies). Instead each entry is made
+    when it is looked up, so the cost falls on whoever reads the results.
+
+    Iterates over the vertices in the order the search closed them, and
+    each predecessor is an Element holding the previous vertex, as in the
+    closed dictionaries built by Dijkstra.
+    """
+
+    def __init__(self, vertices, index, dist, preds, order):
+        """ Create a closed dictionary from the arrays of one search.
+
+        Args:
+            vertices - the vertex for each id
+            index - a dictionary from each vertex to its id
+            dist - the cost of the path to each id
+            preds - the id before each id on its path
+            order - the ids of the reached vertices, in order of cost
+        """
+        self._vertices = vertices
+        self._index = index
+        self._dist = dist
+        self._preds = preds
+        self._order = order
+        # the Element made for each id, so entries share their predecessors
+        self._elements = dict()
+
+    def __getitem__(self, v):
+        """ Return (cost, predecessor Element) for vertex v. """
+        i = self._index.get(v)
+        if i is None or self._dist[i] == float('inf'):
+            raise KeyError(v)
+        pred = self._preds[i]
+        if pred < 0:
+            return (self._dist[i], None)
+        element = self._elements.get(pred)
+        if element is None:
+            element = Element(self._dist[pred], self._vertices[pred], None)
+            self._elements[pred] = element
+        return (self._dist[i], element)
+
+    def __iter__(self):
+        """ Iterate over the reached vertices, in order of cost. """
+        vertices = self._vertices
+        return (vertices[i] for i in self._order)
+
+    def __len__(self):
+        """ Return the number of vertices reached. """
+        return len(self._order)
+
+# Many to many distance matrix
+def distance_matrix(graph, sources, targets, dtype='float64'):
+    """ Return the matrix of shortest path costs from sources to targets.
+
+    Entry [i][j] is the cost from sources[i] to targets[j], or inf if there
+    is no path. Each search stops as soon as every target is closed. If
+    NumPy is installed the result is a dense array of shape
+    (len(sources), len(targets)), and each row is gathered from the search
+    in one vectorised step; otherwise it is a list of array rows.
+
+    Args:
+        graph - a Graph, or a CompactGraph
+        sources - the start vertices, or vertex ids for a CompactGraph
+        targets - the target vertices, or vertex ids for a CompactGraph
+        dtype - 'float64', or 'float32' to halve the storage
+    """
+    if dtype not in ('float64', 'float32'):
+        raise ValueError('dtype must be float64 or float32')
+    if isinstance(graph, CompactGraph):
+        compact = graph
+        source_ids = list(sources)
+        target_ids = list(targets)
+    else:
+        compact = CompactGraph.from_graph(graph)
+        index = {v: i for i, v in enumerate(graph.vertices())}
+        source_ids = [index[v] for v in sources]
+        target_ids = [index[v] for v in targets]
+    if numpy is not None:
+        matrix = numpy.empty((len(source_ids), len(target_ids)), dtype=dtype)
+        columns = numpy.array(target_ids, dtype=numpy.int64)
+    else:
+        code = 'd' if dtype == 'float64' else 'f'
+        matrix = []
+    for row, source in enumerate(source_ids):
+        dist, preds = compact_dijkstra(compact, source, targets=target_ids)
+        if numpy is not None:
+            matrix[row] = numpy.frombuffer(dist, dtype=numpy.float64)[columns]
+        else:
+            matrix.append(array(code, [dist[t] for t in target_ids]))
+    return matrix
@@ -0,0 +1,449 @@
+'''
+Benchmarks, on grid graphs and on synthetic road-like graphs written in
+the route map file format.
+
+Run with: python -m dijkstra.benchmark --help
+'''
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# NumPy is optional, and only used to pass the bulk builders arrays
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .batch import distance_matrix
+from .ch import ContractionHierarchy
+from .compact import CompactGraph, compact_dijkstra
+from .graph import Edge, Graph, Vertex
+from .queues import Element
+from .reader import graphreader, read_graph_records
+from .search import Dijkstra, euclidean_heuristic, shortest_path
+
+# Grid graph generator, used for benchmarking on larger graphs
+def grid_graph(rows, cols):
+    """ Return a rows x cols grid graph with unit length edges.
+
+    Vertices are labelled 1 to rows*cols, row by row.
+
+    Args:
+        rows - the number of rows in the grid
+        cols - the number of columns in the grid
+    """
+    graph = Graph()
+    vertices = [graph.add_vertex(label) for label in range(1, rows*cols + 1)]
+    for r in range(rows):
+        for c in range(cols):
+            v = vertices[r*cols + c]
+            if c + 1 < cols:
+                graph.add_edge(v, vertices[r*cols + c + 1], 1.0)
+            if r + 1 < rows:
+                graph.add_edge(v, vertices[(r+1)*cols + c], 1.0)
+    return graph
+
+# Dijkstra benchmark on grids of increasing size
+def benchmark_dijkstra(sizes=(10000, 100000, 1000000)):
+    """ Time Dijkstra on square grids with roughly the given numbers of vertices.
+
+    Prints one line per grid, with the time per vertex, which should stay
+    roughly flat (growing only with log V) as the grid grows.
+    Returns a list of (vertices, edges, seconds) tuples.
+
+    Args:
+        sizes - the approximate numbers of vertices to benchmark
+    """
+    results = []
+    for size in sizes:
+        side = max(2, int(round(size ** 0.5)))
+        graph = grid_graph(side, side)
+        start = graph.get_vertex_by_label(1)
+        begin = time.perf_counter()
+        closed = Dijkstra(graph, start)
+        seconds = time.perf_counter() - begin
+        results.append((len(closed), graph.num_edges(), seconds))
+        print('Dijkstra on %d vertices, %d edges: %.3f s (%.2f us/vertex)'
+              % (len(closed), graph.num_edges(), seconds,
+                 seconds * 1e6 / len(closed)))
+    return results
+
+
+# Benchmark suite, on synthetic road-like graphs written in the file format
+
+def write_graph_file(filename, nodes, edges):
+    """ Write a route map in the Node/Edge file format read by graphreader.
+
+    Args:
+        filename - the name of the file to write
+        nodes - an iterable of (id, coords), coords being (x, y) or None
+        edges - an iterable of (source id, target id, length, oneway)
+    """
+    with open(filename, 'w') as file:
+        for (nodeid, coords) in nodes:
+            if coords is None:
+                file.write('Node\nid: %d\n' % nodeid)
+            else:
+                file.write('Node\nid: %d\nx: %r\ny: %r\n'
+                           % (nodeid, coords[0], coords[1]))
+        for (source, target, length, oneway) in edges:
+            file.write('Edge\nfrom: %d\nto: %d\nlength: %r\noneway: %s\n'
+                       % (source, target, length,
+                          'true' if oneway else 'false'))
+
+def grid_graph_records(n, rng, oneway=0.0):
+    """ Return (nodes, edges) for a square grid of about n vertices.
+
+    Edge lengths are the distance between the points, stretched by up to
+    30%, so that the straight line distance is a valid A* heuristic.
+
+    Args:
+        n - the approximate number of vertices
+        rng - a random.Random
+        oneway - the fraction of edges that are one-way
+    """
+    side = max(2, int(round(n ** 0.5)))
+    nodes = [(r*side + c + 1, (float(c), float(r)))
+             for r in range(side) for c in range(side)]
+    edges = []
+    for r in range(side):
+        for c in range(side):
+            v = r*side + c + 1
+            if c + 1 < side:
+                edges.append((v, v + 1, round(rng.uniform(1, 1.3), 3),
+                              rng.random() < oneway))
+            if r + 1 < side:
+                edges.append((v, v + side, round(rng.uniform(1, 1.3), 3),
+                              rng.random() < oneway))
+    return nodes, edges
+
+def geometric_graph_records(n, rng, degree=6, oneway=0.0):
+    """ Return (nodes, edges) for a random geometric graph of n vertices.
+
+    Points are scattered in a square, and each is joined to every point
+    within the radius that gives the average degree asked for. Points are
+    bucketed into cells of that radius, so only neighbouring cells are
+    compared.
+
+    Args:
+        n - the number of vertices
+        rng - a random.Random
+        degree - the approximate average number of edges per vertex
+        oneway - the fraction of edges that are one-way
+    """
+    side = n ** 0.5
+    radius = (degree / math.pi) ** 0.5
+    nodes = [(i + 1, (round(rng.uniform(0, side), 3),
+                      round(rng.uniform(0, side), 3))) for i in range(n)]
+    cells = dict()
+    for (nodeid, (x, y)) in nodes:
+        cells.setdefault((int(x // radius), int(y // radius)), []).append(
+            (nodeid, x, y))
+    edges = []
+    for (cx, cy), members in cells.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for (v, x, y) in members:
+                    for (w, x2, y2) in cells.get((cx + dx, cy + dy), ()):
+                        d = math.hypot(x - x2, y - y2)
+                        if v < w and d <= radius:
+                            edges.append((v, w, round(d * 1.001 + 0.001, 3),
+                                          rng.random() < oneway))
+    return nodes, edges
+
+def scale_free_graph_records(n, rng, m=2, oneway=0.0):
+    """ Return (nodes, edges) for a Barabasi-Albert scale-free graph.
+
+    Each new vertex joins m existing ones, chosen in proportion to their
+    degree, so a few hubs end up with very high degree. There are no
+    coordinates, and lengths are uniform between 1 and 10.
+
+    Args:
+        n - the number of vertices
+        rng - a random.Random
+        m - the number of edges added with each vertex
+        oneway - the fraction of edges that are one-way
+    """
+    nodes = [(i + 1, None) for i in range(n)]
+    edges = []
+    # each vertex appears here once for every edge it has
+    ends = list(range(1, min(m, n) + 1))
+    for v in range(m + 1, n + 1):
+        targets = set()
+        while len(targets) < m:
+            targets.add(rng.choice(ends))
+        for w in targets:
+            edges.append((v, w, float(rng.randint(1, 10)),
+                          rng.random() < oneway))
+            ends += (v, w)
+    return nodes, edges
+
+BENCHMARK_GENERATORS = {'grid': grid_graph_records,
+                        'geometric': geometric_graph_records,
+                        'scalefree': scale_free_graph_records}
+
+def _measure(function, count, memory):
+    """ Return (result, phase report) for one benchmark phase.
+
+    The phase is timed on its own, then, if memory is True, run again under
+    tracemalloc to find its peak memory, since tracing slows it down.
+
+    Args:
+        function - the phase, a function of no arguments
+        count - the number of items (records, queries, ...) it handles
+        memory - True to measure peak memory
+    """
+    begin = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - begin
+    report = {'seconds': round(seconds, 6), 'items': count,
+              'per_second': round(count / seconds, 1) if seconds else None}
+    if memory:
+        tracemalloc.start()
+        function()
+        report['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, report
+
+def run_benchmarks(kinds=('grid', 'geometric', 'scalefree'),
+                   sizes=(1000, 10000), queries=20, oneway=0.0, seed=1,
+                   memory=True, output=None, directory=None):
+    """ Benchmark reading, building and searching synthetic graphs.
+
+    For each kind of graph and size, writes a graph file, then times each
+    phase separately: parsing the file, building a Graph and a
+    CompactGraph, a full Dijkstra, and point to point queries through each
+    query API. Each phase reports its time, throughput and (if memory is
+    True) peak memory. Returns the list of results, and writes it as JSON
+    to output, if given, so runs can be compared between releases.
+
+    Args:
+        kinds - names in BENCHMARK_GENERATORS
+        sizes - the numbers of vertices to try
+        queries - the number of point to point queries per API
+        oneway - the fraction of edges that are one-way
+        seed - the random seed, so runs are repeatable
+        memory - True to measure the peak memory of each phase
+        output - the name of a JSON file to write, or None
+        directory - where to write the graph files (default: a temporary
+                    directory, removed afterwards)
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = directory or tmp
+        for kind in kinds:
+            for size in sizes:
+                rng = random.Random(seed)
+                nodes, edges = BENCHMARK_GENERATORS[kind](size, rng,
+                                                          oneway=oneway)
+                filename = os.path.join(directory, '%s-%d.txt' % (kind, size))
+                write_graph_file(filename, nodes, edges)
+                results.append(_benchmark_graph(kind, filename, len(nodes),
+                                                len(edges), queries, rng,
+                                                memory))
+    report = json.dumps(results, indent=2)
+    if output is not None:
+        with open(output, 'w') as file:
+            file.write(report + '\n')
+    return results
+
+def _benchmark_graph(kind, filename, n, m, queries, rng, memory):
+    """ Return the benchmark report for the graph in filename. """
+    phases = dict()
+    records, phases['parse'] = _measure(
+        lambda: list(read_graph_records(filename)), n + m, memory)
+    graph, phases['graphreader'] = _measure(
+        lambda: graphreader(filename, progress=None, verbose=False), n + m,
+        memory)
+    _, phases['build_graph'] = _measure(
+        lambda: _graph_from_records(records), n + m, memory)
+    columns = _edge_columns(records)
+    _, phases['build_bulk'] = _measure(
+        lambda: Graph.from_arrays(*columns), n + m, memory)
+    _, phases['build_compact_bulk'] = _measure(
+        lambda: CompactGraph.from_arrays(*columns[:5]), n + m, memory)
+    compact, phases['build_compact'] = _measure(
+        lambda: CompactGraph.from_graph(graph), n + m, memory)
+    vertices = graph.vertices()
+    start = vertices[0]
+    pairs = [(rng.choice(vertices), rng.choice(vertices))
+             for i in range(queries)]
+    _, phases['dijkstra'] = _measure(lambda: Dijkstra(graph, start), n,
+                                     memory)
+    _, phases['compact_dijkstra'] = _measure(
+        lambda: compact_dijkstra(compact, 0), n, memory)
+    _, phases['shortest_path'] = _measure(
+        lambda: [shortest_path(graph, s, t) for (s, t) in pairs], queries,
+        memory)
+    _, phases['bidirectional'] = _measure(
+        lambda: [shortest_path(graph, s, t, bidirectional=True)
+                 for (s, t) in pairs], queries, memory)
+    if start.coords() is not None:
+        _, phases['astar'] = _measure(
+            lambda: [shortest_path(graph, s, t, euclidean_heuristic)
+                     for (s, t) in pairs], queries, memory)
+    hierarchy, phases['ch_build'] = _measure(
+        lambda: ContractionHierarchy.build(compact), n, False)
+    _, phases['ch_query'] = _measure(
+        lambda: [hierarchy.distance(s.element(), t.element())
+                 for (s, t) in pairs], queries, memory)
+    _, phases['distance_matrix'] = _measure(
+        lambda: distance_matrix(graph, [s for (s, t) in pairs],
+                                [t for (s, t) in pairs]),
+        queries * queries, memory)
+    return {'graph': kind, 'vertices': n, 'edges': m, 'phases': phases}
+
+def _edge_columns(records):
+    """ Return the arguments for Graph.from_arrays, from graph file records.
+
+    The columns are NumPy arrays if NumPy is installed, as they would be
+    when they come from a map rebuild.
+    """
+    nodes = [record for record in records if record[0] == 'Node']
+    edges = [record for record in records if record[0] == 'Edge']
+    columns = [[edge[k] for edge in edges] for k in range(1, 5)]
+    columns.append([node[1] for node in nodes])
+    if numpy is not None:
+        columns = [numpy.asarray(column) for column in columns]
+    columns.append({node[1]: node[2] for node in nodes})
+    return columns
+
+def _graph_from_records(records):
+    """ Return a Graph built from a list of graph file records. """
+    graph = Graph()
+    for record in records:
+        if record[0] == 'Node':
+            graph.add_vertex(record[1], record[2])
+        else:
+            graph.add_edge(graph.get_vertex_by_label(record[1]),
+                           graph.get_vertex_by_label(record[2]),
+                           record[3], record[4])
+    return graph
+
+#---------------------------------------------------------------------------#
+# Memory footprint of the objects a Graph is made of
+
+# The Vertex, Edge and Element classes as they were before they used
+# __slots__, with a __dict__ per object, to compare the footprint against
+class _DictVertex:
+    def __init__(self, element, coords=None):
+        self._element = element
+        self._coords = coords
+
+class _DictEdge:
+    def __init__(self, v, w, element, oneway=False):
+        self._vertices = (v,w)
+        self._element = element
+        self._oneway = oneway
+
+class _DictElement:
+    def __init__(self, k, v, i):
+        self._key = k
+        self._value = v
+        self._index = i
+
+def _bytes_per_object(make, count):
+    """ Return the average memory, in bytes, of count objects from make(i).
+
+    The list holding the objects is not counted, and neither is anything
+    make's arguments refer to, so these should be created beforehand.
+    """
+    tracemalloc.start()
+    try:
+        begin = tracemalloc.get_traced_memory()[0]
+        objects = [make(i) for i in range(count)]
+        used = tracemalloc.get_traced_memory()[0] - begin
+    finally:
+        tracemalloc.stop()
+    return (used - sys.getsizeof(objects)) / count
+
+def memory_footprint(count=100000, side=100):
+    """ Measure the memory per vertex and per edge, before and after slots.
+
+    Compares the __dict__ based classes the graph used to have with the
+    current slotted Vertex, Edge and Element, object by object, then
+    reports the total memory per vertex and per edge of a whole side x side
+    grid Graph (its dictionaries included). Prints a table, and returns
+    the results as a dictionary.
+
+    Args:
+        count - the number of objects of each kind to create
+        side - the size of the grid graph
+    """
+    labels = list(range(count))
+    weights = [float(i) for i in range(count)]
+    vertices = [Vertex(i) for i in labels]
+    pairs = list(zip(vertices, vertices[1:] + vertices[:1]))
+    kinds = (('vertex', _DictVertex, Vertex, lambda cls, i: cls(labels[i])),
+             ('edge', _DictEdge, Edge,
+              lambda cls, i: cls(pairs[i][0], pairs[i][1], weights[i])),
+             ('element', _DictElement, Element,
+              lambda cls, i: cls(weights[i], vertices[i], labels[i])))
+    results = dict()
+    for name, before, after, make in kinds:
+        results[name] = {
+            'before': _bytes_per_object(lambda i: make(before, i), count),
+            'after': _bytes_per_object(lambda i: make(after, i), count)}
+        print('%-8s %6.1f bytes before, %6.1f bytes after'
+              % (name, results[name]['before'], results[name]['after']))
+
+    tracemalloc.start()
+    try:
+        graph = grid_graph(side, side)
+        used = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    results['graph'] = {'vertices': graph.num_vertices(),
+                        'edges': graph.num_edges(),
+                        'bytes': used}
+    print('Graph of %d vertices and %d edges: %d bytes, %.1f bytes/edge'
+          % (graph.num_vertices(), graph.num_edges(), used,
+             used / graph.num_edges()))
+    return results
+
+def main(argv=None):
+    """ Run the benchmark suite from the command line. Returns the exit code.
+
+    Args:
+        argv - the arguments, not including the program name (default:
+               sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m dijkstra.benchmark',
+        description='Benchmark the graph code on synthetic road-like graphs.')
+    parser.add_argument('--kinds', nargs='+', default=sorted(BENCHMARK_GENERATORS),
+                        choices=sorted(BENCHMARK_GENERATORS),
+                        help='the kinds of graph to generate')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000],
+                        help='the numbers of vertices to try')
+    parser.add_argument('--queries', type=int, default=20,
+                        help='point to point queries per API')
+    parser.add_argument('--oneway', type=float, default=0.0,
+                        help='the fraction of edges that are one-way')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='do not measure peak memory (faster)')
+    parser.add_argument('--output', help='write the results as JSON here')
+    parser.add_argument('--directory',
+                        help='keep the generated graph files here')
+    parser.add_argument('--footprint', action='store_true',
+                        help='only measure the memory per vertex and edge')
+    args = parser.parse_args(argv)
+    if args.footprint:
+        memory_footprint()
+        return 0
+    results = run_benchmarks(args.kinds, args.sizes, args.queries,
+                             args.oneway, args.seed, args.memory,
+                             args.output, args.directory)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
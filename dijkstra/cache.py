@@ -0,0 +1,177 @@
+'''
+Cache of shortest path results, for services that see the same queries.
+'''
+from collections import OrderedDict
+
+from .dynamic import DynamicShortestPaths, _change_edge
+from .search import Dijkstra, shortest_path
+
+# Cache of shortest path results, for services that see the same queries
+class ShortestPathCache:
+    """ A least recently used cache in front of Dijkstra and shortest_path.
+
+    Caches whole shortest path trees by source, and point to point results
+    by (source, target). A point to point query is also answered from a
+    cached tree for its source, if there is one. The cache holds at most
+    maxsize results, and, if max_vertices is given, at most that many
+    vertices over all of them (a tree counts every vertex it reaches, a
+    path the vertices on it), evicting the least recently used first.
+
+    Edge changes made through the cache's update_weight and add_edge
+    methods repair the cached trees in place, as DynamicShortestPaths does,
+    and only drop the point to point results. Every lookup also compares
+    the graph's version with the version the results were computed from,
+    and empties the cache if the graph has been changed some other way.
+    """
+
+    def __init__(self, graph, maxsize=128, max_vertices=None):
+        """ Create an empty cache for graph.
+
+        Args:
+            graph - the Graph to search
+            maxsize - the most results to keep
+            max_vertices - the most vertices to keep over all results, or
+                           None for no limit
+        """
+        self._graph = graph
+        self._maxsize = maxsize
+        self._max_vertices = max_vertices
+        self._results = OrderedDict()
+        self._vertices = 0
+        self._version = graph.version()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def dijkstra(self, source):
+        """ Return the closed dictionary of Dijkstra from source.
+
+        The dictionary is shared with the cache, so must not be changed.
+
+        Args:
+            source - the start vertex
+        """
+        self._check_version()
+        key = (source,)
+        tree = self._lookup(key)
+        if tree is None:
+            self.misses += 1
+            closed = Dijkstra(self._graph, source)
+            tree = DynamicShortestPaths(self._graph, source, closed)
+            self._store(key, tree, len(closed))
+        return tree.closed()
+
+    def shortest_path(self, s, t):
+        """ Return (cost, path) for the shortest path from vertex s to t.
+
+        Args:
+            s - the start vertex
+            t - the target vertex
+        """
+        self._check_version()
+        tree = self._lookup((s,))
+        if tree is not None:
+            path = tree.path(t)
+            return (tree.distance(t) if path is not None else float('inf'),
+                    path)
+        key = (s, t)
+        result = self._lookup(key)
+        if result is None:
+            self.misses += 1
+            result = shortest_path(self._graph, s, t)
+            self._store(key, result, len(result[1]) if result[1] else 1)
+        return result
+
+    def update_weight(self, v, w, element):
+        """ Change the weight of the edge from v to w, and repair the cached
+        trees.
+
+        Returns the edge, or None if there is no edge from v to w.
+
+        Args:
+            v - a vertex object
+            w - a vertex object
+            element - the new weight of the edge
+        """
+        return self._change(self._graph.update_weight, v, w, element)
+
+    def add_edge(self, v, w, element, oneway=False):
+        """ Add or replace an edge, as Graph.add_edge, and repair the cached
+        trees.
+
+        Args:
+            v - a vertex object
+            w - a vertex object
+            element - the weight of the edge
+            oneway - True if the edge can only be followed from v to w
+        """
+        return self._change(self._graph.add_edge, v, w, element, oneway)
+
+    def stats(self):
+        """ Return a dictionary of the cache's counters and current size. """
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._results), 'vertices': self._vertices}
+
+    def clear(self):
+        """ Remove every result from the cache. """
+        self._results.clear()
+        self._vertices = 0
+
+    def _check_version(self):
+        """ Empty the cache if the graph has changed since it was filled. """
+        if self._graph.version() != self._version:
+            if self._results:
+                self.invalidations += 1
+            self.clear()
+            self._version = self._graph.version()
+
+    def _change(self, change, v, w, *args):
+        """ Make an edge change to the graph, and repair the cached trees.
+
+        Point to point results are dropped, as they keep no tree to repair.
+        """
+        self._check_version()
+        trees = [tree for key, (tree, size) in self._results.items()
+                 if len(key) == 1]
+        e = _change_edge(self._graph, trees, change, v, w, *args)
+        if e is None:
+            return None
+        self._version = self._graph.version()
+        for key in [key for key in self._results if len(key) == 2]:
+            del self._results[key]
+        # a repaired tree may reach more or fewer vertices than before
+        self._vertices = 0
+        for key, (tree, size) in list(self._results.items()):
+            size = tree.num_vertices()
+            self._results[key] = (tree, size)
+            self._vertices += size
+        self._evict()
+        return e
+
+    def _lookup(self, key):
+        """ Return the result for key, marking it most recently used. """
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        self.hits += 1
+        self._results.move_to_end(key)
+        return entry[0]
+
+    def _store(self, key, result, size):
+        """ Add a result of size vertices, evicting old ones to make room. """
+        self._results[key] = (result, size)
+        self._vertices += size
+        self._evict()
+
+    def _evict(self):
+        """ Evict the least recently used results until the cache fits. """
+        while len(self._results) > 1 and (
+                len(self._results) > self._maxsize
+                or (self._max_vertices is not None
+                    and self._vertices > self._max_vertices)):
+            _, (_, oldsize) = self._results.popitem(last=False)
+            self._vertices -= oldsize
+            self.evictions += 1
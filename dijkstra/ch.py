@@ -0,0 +1,350 @@
+'''
+Contraction hierarchies, for fast repeated queries on a fixed graph.
+'''
+import heapq
+import sys
+from array import array
+
+from .compact import (CompactGraph, _GRAPH_FILE_BIG_ENDIAN, _GRAPH_FILE_HEADER,
+                      _map_arrays, _open_binary_file)
+
+# Contraction hierarchies, for fast repeated queries on a fixed graph
+CH_FILE_MAGIC = b'DJCH'
+CH_FILE_VERSION = 1
+
+class ContractionHierarchy:
+    """ A contraction hierarchy of a graph, answering shortest path queries.
+
+    Preprocessing contracts the vertices one at a time, least important
+    first. Contracting v removes it from the graph, adding a shortcut edge
+    u->w wherever the path u->v->w was the only shortest path between them,
+    so that distances between the remaining vertices are unchanged. The rank
+    of a vertex is its place in that order.
+
+    Each vertex then keeps only its 'upward' edges, to vertices of higher
+    rank. Every shortest path has a version that climbs from s and then
+    descends to t, so a query runs a forward Dijkstra from s over upward
+    edges and a backward one from t over upward edges into t, and the two
+    searches each settle only a few hundred vertices even on large maps.
+
+    Vertices are numbered 0 to n-1 and the hierarchy is stored in flat
+    arrays, in the same CSR form as CompactGraph. Each shortcut records the
+    vertex it bypasses (its middle, -1 for an original edge), so paths can
+    be unpacked back into the original edges.
+    """
+
+    def __init__(self, labels, rank, up_offsets, up_targets, up_weights,
+                 up_middles, down_offsets, down_sources, down_weights,
+                 down_middles):
+        """ Create a hierarchy from its arrays.
+
+        Args:
+            labels - the label of each vertex id
+            rank - the contraction order position of each vertex id
+            up_offsets, up_targets, up_weights, up_middles - the CSR arrays
+                of the edges leaving each vertex to vertices of higher rank
+            down_offsets, down_sources, down_weights, down_middles - the CSR
+                arrays of the edges entering each vertex from vertices of
+                higher rank
+        """
+        self._labels = labels
+        self._rank = rank
+        self._up = (up_offsets, up_targets, up_weights, up_middles)
+        self._down = (down_offsets, down_sources, down_weights, down_middles)
+        self._ids = None
+        self._mmap = None
+
+    @classmethod
+    def build(cls, graph, witness_limit=50):
+        """ Return the contraction hierarchy of graph.
+
+        Vertices are contracted in order of edge difference (shortcuts added
+        less edges removed, plus neighbours already contracted), which is
+        updated lazily: a vertex whose priority has grown since it was
+        queued is queued again rather than contracted.
+
+        Args:
+            graph - a Graph or CompactGraph
+            witness_limit - the most vertices each witness search may
+                settle. A smaller limit preprocesses faster, but may add
+                shortcuts that are not needed.
+        """
+        if not isinstance(graph, CompactGraph):
+            graph = CompactGraph.from_graph(graph)
+        n = graph.num_vertices()
+        # the remaining graph: for each vertex, neighbour: (weight, middle)
+        outs = [dict() for v in range(n)]
+        ins = [dict() for v in range(n)]
+        for v in range(n):
+            for (w, weight) in graph.neighbours(v):
+                if w != v and (w not in outs[v] or weight < outs[v][w][0]):
+                    outs[v][w] = (weight, -1)
+                    ins[w][v] = (weight, -1)
+        contracted_neighbours = array('q', [0]) * n
+        rank = array('q', [0]) * n
+        upwards = [None] * n
+        downwards = [None] * n
+
+        def priority(v):
+            # returns the shortcuts too, so they need not be found again
+            shortcuts = _ch_shortcuts(outs, ins, v, witness_limit)
+            return (len(shortcuts) - len(outs[v]) - len(ins[v])
+                    + contracted_neighbours[v]), shortcuts
+
+        queue = [(priority(v)[0], v) for v in range(n)]
+        heapq.heapify(queue)
+        order = 0
+        while queue:
+            _, v = heapq.heappop(queue)
+            current, shortcuts = priority(v)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+            for (u, w, weight) in shortcuts:
+                if w not in outs[u] or weight < outs[u][w][0]:
+                    outs[u][w] = (weight, v)
+                    ins[w][u] = (weight, v)
+            # every neighbour left is contracted later, so ranks higher
+            upwards[v] = outs[v]
+            downwards[v] = ins[v]
+            for w in outs[v]:
+                del ins[w][v]
+                contracted_neighbours[w] += 1
+            for u in ins[v]:
+                del outs[u][v]
+                contracted_neighbours[u] += 1
+            outs[v] = ins[v] = None
+            rank[v] = order
+            order += 1
+        return cls(list(graph._labels), rank, *_ch_csr(upwards),
+                   *_ch_csr(downwards))
+
+    def save(self, filename):
+        """ Write the hierarchy to filename, to be opened again with load.
+
+        Args:
+            filename - the name of the file to write. The vertex labels
+                       must be integers.
+        """
+        try:
+            labels = array('q', self._labels)
+        except TypeError:
+            raise ValueError('binary hierarchy files need integer labels')
+        flags = _GRAPH_FILE_BIG_ENDIAN if sys.byteorder == 'big' else 0
+        with open(filename, 'wb') as file:
+            file.write(_GRAPH_FILE_HEADER.pack(CH_FILE_MAGIC, CH_FILE_VERSION,
+                                               flags, len(labels),
+                                               len(self._up[1]),
+                                               len(self._down[1])))
+            file.write(labels)
+            file.write(self._rank)
+            for buffer in self._up + self._down:
+                file.write(buffer)
+
+    @classmethod
+    def load(cls, filename):
+        """ Return the hierarchy in filename, written by save.
+
+        The file is memory-mapped, like load_compact_graph, so it opens
+        in the same time whatever its size.
+
+        Args:
+            filename - the name of the file to open
+        """
+        mapping, flags, n, up, down = _open_binary_file(filename,
+                                                        CH_FILE_MAGIC,
+                                                        CH_FILE_VERSION)
+        layout = [('q', n), ('q', n),
+                  ('q', n + 1), ('q', up), ('d', up), ('q', up),
+                  ('q', n + 1), ('q', down), ('d', down), ('q', down)]
+        hierarchy = cls(*_map_arrays(mapping, layout))
+        hierarchy._mmap = mapping
+        return hierarchy
+
+    def num_vertices(self):
+        """ Return the number of vertices in the hierarchy. """
+        return len(self._rank)
+
+    def num_shortcuts(self):
+        """ Return the number of shortcut edges added by contraction. """
+        return (sum(1 for m in self._up[3] if m >= 0)
+                + sum(1 for m in self._down[3] if m >= 0))
+
+    def vertex_id(self, label):
+        """ Return the id of the vertex with label, or None. """
+        if self._ids is None:
+            self._ids = {label: i for i, label in enumerate(self._labels)}
+        return self._ids.get(label)
+
+    def _vertex_ids(self, *labels):
+        """ Return the list of vertex ids of labels.
+
+        Raises KeyError if a label is not in the graph.
+        """
+        ids = []
+        for label in labels:
+            i = self.vertex_id(label)
+            if i is None:
+                raise KeyError('no vertex %s' % label)
+            ids.append(i)
+        return ids
+
+    def distance(self, s, t):
+        """ Return the cost of the shortest path between two labels, or inf.
+
+        Raises KeyError for a label that is not in the graph.
+
+        Args:
+            s - the label of the start vertex
+            t - the label of the target vertex
+        """
+        return self._query(*self._vertex_ids(s, t))[0]
+
+    def shortest_path(self, s, t):
+        """ Return (cost, path) for the shortest path between two labels.
+
+        path is the list of vertex labels from s to t, with every shortcut
+        unpacked into the original edges, or None (and cost is inf) if t
+        cannot be reached from s. Raises KeyError for a label that is not
+        in the graph.
+
+        Args:
+            s - the label of the start vertex
+            t - the label of the target vertex
+        """
+        cost, meet, dists = self._query(*self._vertex_ids(s, t))
+        if meet is None:
+            return cost, None
+        # the two search trees, as (predecessor, weight, middle) per vertex
+        path = [meet]
+        v = meet
+        while dists[0][v][1] is not None:
+            pred, _, middle = dists[0][v][1]
+            path[0:0] = self._unpack(pred, v, middle)[:-1]
+            v = pred
+        v = meet
+        while dists[1][v][1] is not None:
+            succ, _, middle = dists[1][v][1]
+            path += self._unpack(v, succ, middle)[1:]
+            v = succ
+        return cost, [self._labels[v] for v in path]
+
+    def _query(self, s, t):
+        """ Return (cost, meeting vertex, search dictionaries) for ids s, t.
+
+        Runs the upward forward search from s and upward backward search
+        from t, alternately. Each search stops once its smallest open key
+        is at least the best cost found, since everything it could still
+        reach is further away.
+        """
+        dists = ({s: (0.0, None)}, {t: (0.0, None)})
+        opens = ([(0.0, s)], [(0.0, t)])
+        closed = (set(), set())
+        best = 0.0 if s == t else float('inf')
+        meet = s if s == t else None
+        graphs = (self._up, self._down)
+        while opens[0] or opens[1]:
+            for side in (0, 1):
+                open = opens[side]
+                if not open:
+                    continue
+                cost, v = heapq.heappop(open)
+                if v in closed[side]:
+                    continue
+                if cost >= best:
+                    del open[:]
+                    continue
+                closed[side].add(v)
+                other = dists[1 - side].get(v)
+                if other is not None and cost + other[0] < best:
+                    best = cost + other[0]
+                    meet = v
+                offsets, ends, weights, middles = graphs[side]
+                dist = dists[side]
+                for j in range(offsets[v], offsets[v+1]):
+                    w = ends[j]
+                    newcost = cost + weights[j]
+                    if w not in dist or newcost < dist[w][0]:
+                        dist[w] = (newcost, (v, weights[j], middles[j]))
+                        heapq.heappush(open, (newcost, w))
+        return best, meet, dists
+
+    def _unpack(self, v, w, middle):
+        """ Return the list of vertex ids of the original edges of v->w.
+
+        Args:
+            v - the start of the edge
+            w - the end of the edge
+            middle - the vertex bypassed by the edge, or -1 if it is an
+                     original edge
+        """
+        if middle < 0:
+            return [v, w]
+        # both halves were upward edges of middle, which ranks below v and w
+        offsets, sources, _, middles = self._down
+        for j in range(offsets[middle], offsets[middle+1]):
+            if sources[j] == v:
+                first = self._unpack(v, middle, middles[j])
+        offsets, targets, _, middles = self._up
+        for j in range(offsets[middle], offsets[middle+1]):
+            if targets[j] == w:
+                second = self._unpack(middle, w, middles[j])
+        return first + second[1:]
+
+def _ch_shortcuts(outs, ins, v, witness_limit):
+    """ Return the shortcuts (u, w, weight) needed to contract vertex v.
+
+    u->v->w needs a shortcut unless a witness search from u, in the
+    remaining graph without v, finds another path to w that is no longer.
+
+    Args:
+        outs - the edges leaving each remaining vertex
+        ins - the edges entering each remaining vertex
+        v - the vertex to contract
+        witness_limit - the most vertices each witness search may settle
+    """
+    shortcuts = []
+    for u, (inweight, _) in ins[v].items():
+        if not outs[v]:
+            break
+        limit = inweight + max(weight for (weight, _) in outs[v].values())
+        # a Dijkstra search from u, skipping v, stopping at limit or once
+        # every neighbour out of v is settled
+        dist = {u: 0.0}
+        open = [(0.0, u)]
+        settled = set()
+        remaining = len(outs[v]) - (1 if u in outs[v] else 0)
+        while open and len(settled) < witness_limit and remaining > 0:
+            cost, x = heapq.heappop(open)
+            if x in settled:
+                continue
+            if cost > limit:
+                break
+            settled.add(x)
+            if x in outs[v] and x != u:
+                remaining -= 1
+            for y, (weight, _) in outs[x].items():
+                newcost = cost + weight
+                if y != v and newcost < dist.get(y, limit + 1):
+                    dist[y] = newcost
+                    heapq.heappush(open, (newcost, y))
+        for w, (outweight, _) in outs[v].items():
+            if w != u and dist.get(w, float('inf')) > inweight + outweight:
+                shortcuts.append((u, w, inweight + outweight))
+    return shortcuts
+
+def _ch_csr(adjacency):
+    """ Return CSR (offsets, ends, weights, middles) arrays for a list of
+    dictionaries of neighbour: (weight, middle), one per vertex id.
+    """
+    offsets = array('q', [0]) * (len(adjacency) + 1)
+    ends = array('q')
+    weights = array('d')
+    middles = array('q')
+    for v, edges in enumerate(adjacency):
+        for w, (weight, middle) in edges.items():
+            ends.append(w)
+            weights.append(weight)
+            middles.append(middle)
+        offsets[v+1] = len(ends)
+    return offsets, ends, weights, middles
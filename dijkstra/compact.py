@@ -0,0 +1,604 @@
+'''
+Compact (CSR) graphs, their binary file format, and Dijkstra over them.
+'''
+import heapq
+import mmap
+import struct
+import sys
+import time
+from array import array
+
+# NumPy is optional, and only used to build graphs in bulk from arrays
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .graph import _bulk_arcs, _bulk_edges
+from .queues import make_queue
+
+# Compact graph, stored in compressed sparse row (CSR) form
+class CompactGraph:
+    """ A frozen graph stored in compressed sparse row (CSR) form.
+
+    Vertices are numbered 0 to n-1. The edges leaving vertex i are entries
+    offsets[i] to offsets[i+1]-1 of the targets and weights arrays. All three
+    are flat arrays of machine numbers rather than Vertex and Edge objects,
+    so a graph takes a small fraction of the memory of a Graph, and can be
+    searched without allocating anything per edge.
+
+    Each undirected edge is stored once in each direction, and each one-way
+    edge only in its own direction. If there are one-way edges, a second set
+    of arrays holds the edges entering each vertex, for backward searches;
+    otherwise these are the same arrays as the edges leaving it.
+    """
+
+    def __init__(self, labels, offsets, targets, weights, in_offsets=None,
+                 in_sources=None, in_weights=None, num_edges=None):
+        """ Create a compact graph from its arrays.
+
+        Args:
+            labels - a list of the label for each vertex id
+            offsets - an array of n+1 indices into targets and weights
+            targets - an array of the target vertex id of each edge
+            weights - an array of the weight of each edge
+            in_offsets - an array of n+1 indices into in_sources and
+                         in_weights, or None if there are no one-way edges
+            in_sources - an array of the source vertex id of each edge in
+            in_weights - an array of the weight of each edge in
+            num_edges - the number of edges, counting each undirected edge
+                        once (by default, half the number of targets)
+        """
+        self._labels = labels
+        self._offsets = offsets
+        self._targets = targets
+        self._weights = weights
+        if in_offsets is None:
+            in_offsets, in_sources, in_weights = offsets, targets, weights
+        self._in_offsets = in_offsets
+        self._in_sources = in_sources
+        self._in_weights = in_weights
+        if num_edges is None:
+            num_edges = len(targets) // 2
+        self._num_edges = num_edges
+        self._ids = None
+        self._components = None
+        # set when the arrays are views of a memory-mapped graph file
+        self._mmap = None
+        self._filename = None
+
+    @classmethod
+    def from_graph(cls, graph):
+        """ Return a compact copy of graph, numbering vertices in graph order.
+
+        Args:
+            graph - a Graph whose edge elements are the edge weights
+        """
+        vertices = graph.vertices()
+        ids = {v: i for i, v in enumerate(vertices)}
+        offsets, targets, weights = _graph_csr(graph._structure, vertices, ids)
+        if graph.is_directed():
+            in_arrays = _graph_csr(graph._in_structure, vertices, ids)
+        else:
+            in_arrays = (None, None, None)
+        compact = cls([v.element() for v in vertices], offsets, targets,
+                      weights, *in_arrays, num_edges=graph.num_edges())
+        return compact
+
+    @classmethod
+    def from_edges(cls, labels, edges):
+        """ Return a compact graph built from vertex labels and weighted edges.
+
+        Args:
+            labels - an iterable of vertex labels
+            edges - an iterable of (source label, target label, weight) or
+                    (source label, target label, weight, oneway)
+        """
+        builder = CompactGraphBuilder()
+        for label in labels:
+            builder.add_vertex(label)
+        for edge in edges:
+            builder.add_edge(*edge)
+        return builder.build()
+
+    @classmethod
+    def from_arrays(cls, sources, targets, weights, oneway=None, labels=None):
+        """ Return a compact graph built in bulk from parallel arrays of edges.
+
+        The edges are merged as by Graph.from_arrays, keeping the cheapest
+        in each direction, and go straight into the CSR arrays.
+
+        Args:
+            sources - the label of the start vertex of each edge
+            targets - the label of the end vertex of each edge
+            weights - the weight of each edge
+            oneway - True for each edge that can only be followed from its
+                     start to its end (default: all edges are two-way)
+            labels - the labels of the vertices, in id order (default: the
+                     labels in the edges, sorted)
+        """
+        labels, starts, ends, lengths, oneways = _bulk_edges(
+            sources, targets, weights, oneway, labels)
+        n = len(labels)
+        directed = bool(any(oneways))
+        if numpy is not None:
+            out_arrays = _bulk_csr(n, starts, ends, lengths, oneways, False)
+            if directed:
+                in_arrays = _bulk_csr(n, starts, ends, lengths, oneways, True)
+        else:
+            out_arrays = _edge_list_csr(n, starts, ends, lengths, oneways)
+            if directed:
+                in_arrays = _edge_list_csr(n, ends, starts, lengths, oneways)
+        if not directed:
+            in_arrays = (None, None, None)
+        return cls(labels, *out_arrays, *in_arrays, num_edges=len(starts))
+
+    def __str__(self):
+        """ Return a short summary of the graph. """
+        return ('|V| = ' + str(self.num_vertices())
+                + '; |E| = ' + str(self.num_edges()) + ' (compact)')
+
+    def num_vertices(self):
+        """ Return the number of vertices in the graph. """
+        return len(self._offsets) - 1
+
+    def num_edges(self):
+        """ Return the number of edges in the graph. """
+        return self._num_edges
+
+    def is_directed(self):
+        """ Return True if the graph has any one-way edges. """
+        return self._in_offsets is not self._offsets
+
+    def vertex_id(self, label):
+        """ Return the id of the vertex with label, or None. """
+        if self._ids is None:
+            self._ids = {label: i for i, label in enumerate(self._labels)}
+        return self._ids.get(label)
+
+    def close(self):
+        """ Release the memory-mapped file behind the graph, if any.
+
+        The graph cannot be used after it is closed.
+        """
+        if self._mmap is not None:
+            buffers = [self._offsets, self._targets, self._weights,
+                       self._labels]
+            if self.is_directed():
+                buffers += [self._in_offsets, self._in_sources,
+                            self._in_weights]
+            for buffer in buffers:
+                buffer.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def label(self, i):
+        """ Return the label of vertex id i. """
+        return self._labels[i]
+
+    def degree(self, i):
+        """ Return the number of edges leaving vertex id i. """
+        return self._offsets[i+1] - self._offsets[i]
+
+    def in_degree(self, i):
+        """ Return the number of edges entering vertex id i. """
+        return self._in_offsets[i+1] - self._in_offsets[i]
+
+    def neighbours(self, i):
+        """ Return a list of (target id, weight) pairs for edges leaving i. """
+        start, end = self._offsets[i], self._offsets[i+1]
+        return list(zip(self._targets[start:end], self._weights[start:end]))
+
+    def in_neighbours(self, i):
+        """ Return a list of (source id, weight) pairs for edges entering i. """
+        start, end = self._in_offsets[i], self._in_offsets[i+1]
+        return list(zip(self._in_sources[start:end],
+                        self._in_weights[start:end]))
+
+    def components(self):
+        """ Return an array of the component number of each vertex id.
+
+        Components are weakly connected, as for Graph.components. As the
+        graph cannot change, the index is built once, on first use.
+        """
+        if self._components is None:
+            self._components = _csr_components(self)
+        return self._components
+
+    def connected(self, i, j):
+        """ Return True if vertex ids i and j are in the same component.
+
+        If this is False, there is no path between them.
+        """
+        components = self.components()
+        return components[i] == components[j]
+
+    def __reduce_ex__(self, protocol):
+        """ Pickle a memory-mapped graph as its file name, not its arrays.
+
+        Unpickling it, for example in a worker process, maps the same file
+        again, so the graph's pages are shared rather than copied.
+        """
+        if self._mmap is not None:
+            return (load_compact_graph, (self._filename,))
+        return super().__reduce_ex__(protocol)
+
+def _csr_components(graph):
+    """ Return an array of the weakly connected component of each vertex id.
+
+    Args:
+        graph - a CompactGraph
+    """
+    n = graph.num_vertices()
+    component = array('q', [-1]) * n
+    arrays = [(graph._offsets, graph._targets)]
+    if graph.is_directed():
+        arrays.append((graph._in_offsets, graph._in_sources))
+    count = 0
+    for v in range(n):
+        if component[v] >= 0:
+            continue
+        component[v] = count
+        stack = [v]
+        while stack:
+            x = stack.pop()
+            for offsets, ends in arrays:
+                for j in range(offsets[x], offsets[x+1]):
+                    y = ends[j]
+                    if component[y] < 0:
+                        component[y] = count
+                        stack.append(y)
+        count += 1
+    return component
+
+def _graph_csr(structure, vertices, ids):
+    """ Return CSR (offsets, targets, weights) arrays for a Graph structure.
+
+    Args:
+        structure - a dictionary of vertex to (vertex to edge) dictionaries
+        vertices - the vertices, in id order
+        ids - a dictionary of vertex to id
+    """
+    offsets = array('q', [0]) * (len(vertices) + 1)
+    targets = array('q')
+    weights = array('d')
+    for i, v in enumerate(vertices):
+        for w, e in structure[v].items():
+            targets.append(ids[w])
+            weights.append(e.element())
+        offsets[i+1] = len(targets)
+    return offsets, targets, weights
+
+def _edge_list_csr(n, sources, ends, lengths, oneway):
+    """ Return CSR (offsets, targets, weights) arrays for a list of edges.
+
+    Each edge is stored from its source to its end, and also from its end
+    to its source if it is not one-way.
+
+    Args:
+        n - the number of vertices
+        sources - an array of the source id of each edge
+        ends - an array of the end id of each edge
+        lengths - an array of the length of each edge
+        oneway - a bytearray, 1 for each edge that is one-way
+    """
+    # count the degree of each vertex, then turn the counts into offsets
+    offsets = array('q', [0]) * (n + 1)
+    for i in range(len(sources)):
+        offsets[sources[i]+1] += 1
+        if not oneway[i]:
+            offsets[ends[i]+1] += 1
+    for i in range(n):
+        offsets[i+1] += offsets[i]
+    # drop each edge into the next free slot of its end(s)
+    fill = array('q', offsets[:-1])
+    targets = array('q', [0]) * offsets[-1]
+    weights = array('d', [0.0]) * offsets[-1]
+    for i in range(len(sources)):
+        v, w = sources[i], ends[i]
+        targets[fill[v]] = w
+        weights[fill[v]] = lengths[i]
+        fill[v] += 1
+        if not oneway[i]:
+            targets[fill[w]] = v
+            weights[fill[w]] = lengths[i]
+            fill[w] += 1
+    return offsets, targets, weights
+
+def _bulk_csr(n, starts, ends, lengths, oneways, by_end):
+    """ Return CSR (offsets, targets, weights) arrays for bulk edges.
+
+    Args:
+        n - the number of vertices
+        starts, ends, lengths, oneways - NumPy arrays from _bulk_edges
+        by_end - True for the arrays of edges in rather than out
+    """
+    bounds, others, edges = _bulk_arcs(n, starts, ends, oneways, by_end)
+    return (array('q', bounds.tolist()), array('q', others.tolist()),
+            array('d', lengths[edges].tolist()))
+
+class CompactGraphBuilder:
+    """ Collect vertices and edges one at a time, then build a CompactGraph.
+
+    Edges are kept in flat arrays of ids until build(), which sorts them
+    into CSR order with a counting sort, so no Edge objects are created.
+    """
+
+    def __init__(self):
+        """ Create an empty builder. """
+        self._labels = []
+        self._ids = dict()
+        self._sources = array('q')
+        self._ends = array('q')
+        self._lengths = array('d')
+        self._oneway = bytearray()
+
+    def add_vertex(self, label):
+        """ Add a vertex with label, if new, and return its id. """
+        i = self._ids.get(label)
+        if i is None:
+            i = len(self._labels)
+            self._ids[label] = i
+            self._labels.append(label)
+        return i
+
+    def add_edge(self, source, target, weight, oneway=False):
+        """ Add an edge between the vertices labelled source and target.
+
+        Args:
+            source - the label of a vertex already added
+            target - the label of a vertex already added
+            weight - the length of the edge
+            oneway - True if the edge can only be followed from source
+        """
+        self._sources.append(self._ids[source])
+        self._ends.append(self._ids[target])
+        self._lengths.append(weight)
+        self._oneway.append(1 if oneway else 0)
+
+    def build(self):
+        """ Return the CompactGraph of the vertices and edges added so far. """
+        n = len(self._labels)
+        out_arrays = _edge_list_csr(n, self._sources, self._ends,
+                                    self._lengths, self._oneway)
+        if 1 in self._oneway:
+            # the edges in are the edges out with their ends swapped
+            in_arrays = _edge_list_csr(n, self._ends, self._sources,
+                                       self._lengths, self._oneway)
+        else:
+            in_arrays = (None, None, None)
+        graph = CompactGraph(list(self._labels), *out_arrays, *in_arrays,
+                             num_edges=len(self._sources))
+        graph._ids = dict(self._ids)
+        return graph
+
+# Path reconstruction from compact_dijkstra's predecessor array
+def compact_path(dist, preds, target):
+    """ Return the list of vertex ids on the path to target, or None.
+
+    Args:
+        dist - the dist array returned by compact_dijkstra
+        preds - the preds array returned by compact_dijkstra
+        target - a vertex id
+    """
+    if dist[target] == float('inf'):
+        return None
+    path = [target]
+    while preds[target] >= 0:
+        target = preds[target]
+        path.append(target)
+    path.reverse()
+    return path
+
+# Binary graph files, which can be memory-mapped rather than parsed
+#
+# Layout: a 32 byte header (magic, version, flags, |V|, number of stored
+# edges out, |E|), then the offsets, targets, weights and labels arrays,
+# one after the other, each as native 8 byte ints or doubles. If the graph
+# has one-way edges (flag 2), the in_offsets, in_sources and in_weights
+# arrays follow.
+GRAPH_FILE_MAGIC = b'DJKG'
+GRAPH_FILE_VERSION = 1
+_GRAPH_FILE_HEADER = struct.Struct('<4sHHqqq')
+_GRAPH_FILE_BIG_ENDIAN = 1
+_GRAPH_FILE_DIRECTED = 2
+
+def save_compact_graph(graph, filename):
+    """ Write graph to filename in the binary graph file format.
+
+    Args:
+        graph - a CompactGraph, or a Graph which is converted first. The
+                vertex labels must be integers.
+        filename - the name of the file to write
+    """
+    if not isinstance(graph, CompactGraph):
+        graph = CompactGraph.from_graph(graph)
+    try:
+        labels = array('q', graph._labels)
+    except TypeError:
+        raise ValueError('binary graph files need integer vertex labels')
+    flags = _GRAPH_FILE_BIG_ENDIAN if sys.byteorder == 'big' else 0
+    if graph.is_directed():
+        flags |= _GRAPH_FILE_DIRECTED
+    with open(filename, 'wb') as file:
+        file.write(_GRAPH_FILE_HEADER.pack(GRAPH_FILE_MAGIC,
+                                           GRAPH_FILE_VERSION, flags,
+                                           graph.num_vertices(),
+                                           len(graph._targets),
+                                           graph.num_edges()))
+        file.write(graph._offsets)
+        file.write(graph._targets)
+        file.write(graph._weights)
+        file.write(labels)
+        if graph.is_directed():
+            file.write(graph._in_offsets)
+            file.write(graph._in_sources)
+            file.write(graph._in_weights)
+
+def load_compact_graph(filename):
+    """ Return the CompactGraph in the binary graph file filename.
+
+    The file is memory-mapped, and the graph's arrays are views straight
+    onto the mapping, so nothing is parsed or copied: loading takes the same
+    time for any size of graph, and every process that loads the same file
+    shares one copy of it in the page cache.
+
+    Args:
+        filename - the name of a file written by save_compact_graph
+    """
+    mapping, flags, n, m, e = _open_binary_file(filename, GRAPH_FILE_MAGIC,
+                                                GRAPH_FILE_VERSION)
+    layout = [('q', n + 1), ('q', m), ('d', m), ('q', n)]
+    if flags & _GRAPH_FILE_DIRECTED:
+        # the edges in have the same total count as the edges out
+        layout += [('q', n + 1), ('q', m), ('d', m)]
+    arrays = _map_arrays(mapping, layout)
+    graph = CompactGraph(arrays[3], arrays[0], arrays[1], arrays[2],
+                         *arrays[4:], num_edges=e)
+    graph._mmap = mapping
+    graph._filename = filename
+    return graph
+
+def _open_binary_file(filename, magic, version):
+    """ Memory-map a binary file, and check and unpack its header.
+
+    Returns (mapping, flags, a, b, c), where a, b and c are the three
+    counts in the header. Raises ValueError if the file does not start with
+    magic and version, or was written on a machine of the other byte order.
+
+    Args:
+        filename - the name of the file to map
+        magic - the 4 bytes the file must start with
+        version - the format version the file must have
+    """
+    with open(filename, 'rb') as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapping) < _GRAPH_FILE_HEADER.size:
+        mapping.close()
+        raise ValueError(filename + ' is not a binary graph file')
+    header = _GRAPH_FILE_HEADER.unpack_from(mapping)
+    if header[0] != magic or header[1] != version:
+        mapping.close()
+        raise ValueError(filename + ' is not a binary graph file')
+    if bool(header[2] & _GRAPH_FILE_BIG_ENDIAN) != (sys.byteorder == 'big'):
+        mapping.close()
+        raise ValueError(filename + ' was written with the other byte order')
+    return (mapping,) + header[2:]
+
+def _map_arrays(mapping, layout):
+    """ Return memoryviews of the arrays that follow a binary file header.
+
+    Args:
+        mapping - the memory-mapped file
+        layout - a list of (type code, count) for each 8 byte array, in
+                 file order
+    """
+    view = memoryview(mapping)
+    pos = _GRAPH_FILE_HEADER.size
+    arrays = []
+    for (code, count) in layout:
+        arrays.append(view[pos:pos + 8*count].cast(code))
+        pos += 8*count
+    return arrays
+
+# Dijkstra's algorithm on a CompactGraph
+def compact_dijkstra(graph, source, target=None, reverse=False, targets=None,
+                     queue=None, stats=None, order=None):
+    """ Return (dist, preds) arrays of the shortest paths from source.
+
+    dist[i] is the cost of the shortest path to vertex id i (inf if i cannot
+    be reached), and preds[i] is the id of the vertex before i on that path
+    (-1 for the source and unreached vertices).
+
+    The open set is a heapq list with lazy deletion: an improved vertex is
+    pushed again, and stale entries are skipped when they are popped.
+
+    Args:
+        graph - a CompactGraph
+        source - the id of the start vertex
+        target - if given, stop once this vertex id is closed. Only the
+                 entries for closed vertices are then final.
+        reverse - if True, follow edges backwards, giving the shortest
+                  paths to source rather than from it
+        targets - if given, a collection of vertex ids: stop once all of
+                  them are closed
+        queue - if given, the name or class of one of the QUEUE_BACKENDS
+                to use as the open set instead of the heapq list
+        stats - a SearchStats to add the search's counts to, or None. With
+                the lazy heapq list, every push is a new entry, so
+                decrease_keys stays 0 and pushes counts the re-pushes too.
+        order - if given, a list or array('q') that the id of each vertex
+                is appended to as it is closed, so in order of cost
+    """
+    if stats is not None:
+        begin = time.perf_counter()
+        pushes = 1
+        settled = 0
+        relaxed = 0
+    remaining = set(targets) if targets is not None else None
+    if reverse:
+        offsets = graph._in_offsets
+        ends = graph._in_sources
+        weights = graph._in_weights
+    else:
+        offsets = graph._offsets
+        ends = graph._targets
+        weights = graph._weights
+    n = graph.num_vertices()
+    dist = array('d', [float('inf')]) * n
+    preds = array('q', [-1]) * n
+    closed = bytearray(n)
+    dist[source] = 0.0
+    if ((remaining is not None and not remaining)
+            or (target is not None and not graph.connected(source, target))):
+        # with no targets to close there is nothing to search for, and a
+        # target in another component cannot be reached, so do not search
+        # (but still count the search in stats)
+        open = []
+        if stats is not None:
+            pushes = 0
+    elif queue is not None:
+        open = make_queue(queue)
+        open.push(source, 0.0)
+        pop, push = open.pop_min, open.push
+    else:
+        open = [(0.0, source)]
+    while open:
+        if queue is not None:
+            cost, v = pop()
+        else:
+            cost, v = heapq.heappop(open)
+        if closed[v]:
+            continue
+        closed[v] = 1
+        if order is not None:
+            order.append(v)
+        if stats is not None:
+            settled += 1
+        if v == target:
+            break
+        if remaining is not None and v in remaining:
+            remaining.discard(v)
+            if not remaining:
+                break
+        if stats is not None:
+            relaxed += offsets[v+1] - offsets[v]
+        for j in range(offsets[v], offsets[v+1]):
+            w = ends[j]
+            newcost = cost + weights[j]
+            if newcost < dist[w]:
+                dist[w] = newcost
+                preds[w] = v
+                if queue is not None:
+                    push(w, newcost)
+                else:
+                    heapq.heappush(open, (newcost, w))
+                if stats is not None:
+                    pushes += 1
+    if stats is not None:
+        stats.add_time('search', time.perf_counter() - begin)
+        stats.settled += settled
+        stats.relaxed += relaxed
+        stats.pushes += pushes
+        stats.finish()
+    return dist, preds
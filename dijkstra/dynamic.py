@@ -0,0 +1,356 @@
+'''
+Shortest path tree kept up to date as edge weights change.
+'''
+import heapq
+
+from .queues import Element
+from .search import Dijkstra, path_to
+
+# Shortest path tree kept up to date as edge weights change
+class DynamicShortestPaths:
+    """ The shortest paths from one source, repaired after each edge change.
+
+    Changes to the graph must be made through this object's update_weight
+    and add_edge methods (or those of a DynamicShortestPathTrees holding
+    it), which make the change and then repair only the part of the tree
+    it affects:
+
+    - If an edge gets cheaper, the vertices it now reaches more cheaply are
+      improved by a Dijkstra search starting from the end of that edge.
+    - If an edge in the tree gets dearer, every vertex below it in the tree
+      loses its path. Each is given the best cost through its edges in from
+      vertices that kept their paths, and a Dijkstra search from those
+      vertices settles the subtree again.
+
+    So the cost of a change depends on how much of the tree it changes, not
+    on the size of the graph.
+
+    The tree records the graph's version. If the graph is changed some
+    other way, the tree is computed again from scratch when it is next
+    used, rather than giving paths for the old graph.
+
+    Edges of weight 0 are allowed; here b keeps its path through a when
+    the edge to a gets dearer, and stays after a in closed():
+
+    >>> from dijkstra import Graph
+    >>> g = Graph()
+    >>> s, a, b = g.add_vertex('s'), g.add_vertex('a'), g.add_vertex('b')
+    >>> _ = g.add_edge(s, a, 5.0), g.add_edge(a, b, 0.0), g.add_edge(s, b, 9.0)
+    >>> paths = DynamicShortestPaths(g, s)
+    >>> _ = paths.update_weight(s, a, 6.0)
+    >>> [(v.element(), cost) for v, (cost, pred) in paths.closed().items()]
+    [('s', 0.0), ('a', 6.0), ('b', 6.0)]
+    >>> [v.element() for v in paths.path(b)]
+    ['s', 'a', 'b']
+    """
+
+    def __init__(self, graph, source, closed=None):
+        """ Compute the shortest paths in graph from source.
+
+        Args:
+            graph - a Graph whose edge elements are the edge weights
+            source - the start vertex
+            closed - the closed dictionary of Dijkstra from source on the
+                     graph as it is now, if it has already been computed
+        """
+        self._graph = graph
+        self._source = source
+        self._build(closed)
+
+    def source(self):
+        """ Return the start vertex. """
+        return self._source
+
+    def distance(self, v):
+        """ Return the cost of the shortest path to vertex v, or inf. """
+        self._check_version()
+        if self._dist is None:
+            entry = self._closed.get(v)
+            return entry[0] if entry is not None else float('inf')
+        return self._dist.get(v, float('inf'))
+
+    def path(self, v):
+        """ Return the list of vertices on the shortest path to v, or None. """
+        self._check_version()
+        if self._dist is None:
+            return path_to(self._closed, v)[1]
+        if v not in self._dist:
+            return None
+        path = [v]
+        while self._pred[v] is not None:
+            v = self._pred[v]
+            path.append(v)
+        path.reverse()
+        return path
+
+    def closed(self):
+        """ Return the paths as a closed dictionary, like Dijkstra's.
+
+        The dictionary is kept until the next change, so must not be
+        changed.
+        """
+        self._check_version()
+        if self._closed is None:
+            # walk down the tree from the source in order of cost, so each
+            # vertex comes after its predecessor even when an edge of
+            # weight 0 gives them the same cost (sorting by cost alone
+            # could put a child first)
+            elements = dict()
+            closed = dict()
+            open = [(0.0, id(self._source), self._source)]
+            while open:
+                cost, _, v = heapq.heappop(open)
+                elements[v] = Element(cost, v, None)
+                pred = self._pred[v]
+                closed[v] = (cost,
+                             elements[pred] if pred is not None else None)
+                for x in self._children.get(v, ()):
+                    heapq.heappush(open, (self._dist[x], id(x), x))
+            self._closed = closed
+        return self._closed
+
+    def num_vertices(self):
+        """ Return the number of vertices reached from the source. """
+        self._check_version()
+        if self._dist is None:
+            return len(self._closed)
+        return len(self._dist)
+
+    def update_weight(self, v, w, element):
+        """ Change the weight of the edge from v to w, and repair the paths.
+
+        Returns the edge, or None if there is no edge from v to w.
+
+        Args:
+            v - a vertex object
+            w - a vertex object
+            element - the new weight of the edge
+        """
+        return _change_edge(self._graph, [self], self._graph.update_weight,
+                            v, w, element)
+
+    def add_edge(self, v, w, element, oneway=False):
+        """ Add or replace an edge, as Graph.add_edge, and repair the paths.
+
+        Args:
+            v - a vertex object
+            w - a vertex object
+            element - the weight of the edge
+            oneway - True if the edge can only be followed from v to w
+        """
+        return _change_edge(self._graph, [self], self._graph.add_edge,
+                            v, w, element, oneway)
+
+    def _build(self, closed=None):
+        """ Compute the paths from scratch, or take them from closed. """
+        if closed is None:
+            closed = Dijkstra(self._graph, self._source)
+        self._closed = closed
+        # the tree itself is only made from closed when a change needs it,
+        # so a tree that is never changed costs no more than Dijkstra
+        self._dist = None
+        self._pred = None
+        self._children = None
+        self._version = self._graph.version()
+
+    def _check_version(self):
+        """ Compute the paths again if the graph has changed other than
+        through update_weight or add_edge.
+        """
+        if self._graph.version() != self._version:
+            self._build()
+
+    def _make_tree(self):
+        """ Fill in the distances, predecessors and children from closed. """
+        if self._dist is not None:
+            return
+        self._dist = dict()
+        self._pred = dict()
+        self._children = dict()
+        for v, (cost, pred) in self._closed.items():
+            self._dist[v] = cost
+            self._set_pred(v, pred._value if pred is not None else None)
+
+    def _repair(self, v, w, before):
+        """ Repair the paths after the edges between v and w changed.
+
+        Args:
+            v - a vertex object
+            w - a vertex object
+            before - the weights of v->w and w->v before the change
+        """
+        self._make_tree()
+        self._closed = None
+        self._version = self._graph.version()
+        inf = float('inf')
+        after = _edge_weights(self._graph, v, w)
+        dist = self._dist
+        open = []
+        # first, drop the paths of everything below an edge that got dearer
+        affected = set()
+        for (a, b, old, new) in ((v, w, before[0], after[0]),
+                                 (w, v, before[1], after[1])):
+            if new > old and self._pred.get(b) is a:
+                affected.update(self._subtree(b))
+        for x in affected:
+            del dist[x]
+            self._set_pred(x, None)
+        # give each of them its best cost from the vertices still reached
+        for x in affected:
+            for e in self._graph.get_in_edges(x):
+                u = e.opposite(x)
+                if u in dist and dist[u] + e.element() < dist.get(x, inf):
+                    dist[x] = dist[u] + e.element()
+                    self._set_pred(x, u)
+            if x in dist:
+                heapq.heappush(open, (dist[x], id(x), x))
+        # then, start from the end of any edge that got cheaper
+        for (a, b, old, new) in ((v, w, before[0], after[0]),
+                                 (w, v, before[1], after[1])):
+            if new < old and a in dist and dist[a] + new < dist.get(b, inf):
+                dist[b] = dist[a] + new
+                self._set_pred(b, a)
+                heapq.heappush(open, (dist[b], id(b), b))
+        # and settle everything whose cost changed
+        while open:
+            cost, _, x = heapq.heappop(open)
+            if cost > dist.get(x, inf):
+                continue
+            for e in self._graph.get_edges(x):
+                y = e.opposite(x)
+                newcost = cost + e.element()
+                if newcost < dist.get(y, inf):
+                    dist[y] = newcost
+                    self._set_pred(y, x)
+                    heapq.heappush(open, (newcost, id(y), y))
+
+    def _subtree(self, v):
+        """ Return the list of v and all the vertices below it in the tree. """
+        subtree = [v]
+        for x in subtree:
+            subtree.extend(self._children.get(x, ()))
+        return subtree
+
+    def _set_pred(self, v, pred):
+        """ Make pred the vertex before v in the tree (None for no parent). """
+        old = self._pred.get(v)
+        if old is not None:
+            self._children[old].discard(v)
+        self._pred[v] = pred
+        if pred is not None:
+            self._children.setdefault(pred, set()).add(v)
+
+# Shortest path trees of several sources, repaired together
+class DynamicShortestPathTrees:
+    """ The shortest paths from several sources on one graph, all repaired
+    after each edge change.
+
+    Changes must be made through this object's update_weight and add_edge
+    methods, which make the change to the graph once and then repair each
+    tree, as DynamicShortestPaths does for one. As with one tree, if the
+    graph is changed some other way, each tree is computed again when it
+    is next used.
+    """
+
+    def __init__(self, graph, sources=()):
+        """ Compute the shortest paths in graph from each of sources.
+
+        Args:
+            graph - a Graph whose edge elements are the edge weights
+            sources - the start vertices
+        """
+        self._graph = graph
+        self._trees = dict()
+        for source in sources:
+            self.add_source(source)
+
+    def __len__(self):
+        """ Return the number of trees. """
+        return len(self._trees)
+
+    def __contains__(self, source):
+        """ Return True if there is a tree for source. """
+        return source in self._trees
+
+    def sources(self):
+        """ Return the list of start vertices. """
+        return list(self._trees)
+
+    def tree(self, source):
+        """ Return the DynamicShortestPaths of source.
+
+        Raises KeyError if source has no tree.
+        """
+        return self._trees[source]
+
+    def add_source(self, source, closed=None):
+        """ Add and return the tree of source, unless it already has one.
+
+        Args:
+            source - the start vertex
+            closed - the closed dictionary of Dijkstra from source on the
+                     graph as it is now, if it has already been computed
+        """
+        tree = self._trees.get(source)
+        if tree is None:
+            tree = DynamicShortestPaths(self._graph, source, closed)
+            self._trees[source] = tree
+        return tree
+
+    def remove_source(self, source):
+        """ Stop keeping the tree of source, if it has one. """
+        self._trees.pop(source, None)
+
+    def update_weight(self, v, w, element):
+        """ Change the weight of the edge from v to w, and repair each tree.
+
+        Returns the edge, or None if there is no edge from v to w.
+
+        Args:
+            v - a vertex object
+            w - a vertex object
+            element - the new weight of the edge
+        """
+        return _change_edge(self._graph, self._trees.values(),
+                            self._graph.update_weight, v, w, element)
+
+    def add_edge(self, v, w, element, oneway=False):
+        """ Add or replace an edge, as Graph.add_edge, and repair each tree.
+
+        Args:
+            v - a vertex object
+            w - a vertex object
+            element - the weight of the edge
+            oneway - True if the edge can only be followed from v to w
+        """
+        return _change_edge(self._graph, self._trees.values(),
+                            self._graph.add_edge, v, w, element, oneway)
+
+def _change_edge(graph, trees, change, v, w, *args):
+    """ Make a change to the edges between v and w, and repair each tree.
+
+    Trees that were already out of date are left to be computed again when
+    they are next used. Returns the edge, or None if nothing changed.
+
+    Args:
+        graph - the Graph the trees are on
+        trees - DynamicShortestPaths objects on graph
+        change - graph.update_weight or graph.add_edge
+        v, w, args - the arguments for change
+    """
+    version = graph.version()
+    before = _edge_weights(graph, v, w)
+    e = change(v, w, *args)
+    if e is not None:
+        for tree in trees:
+            if tree._version == version:
+                tree._repair(v, w, before)
+    return e
+
+def _edge_weights(graph, v, w):
+    """ Return the weights of the edges v->w and w->v (inf if none). """
+    inf = float('inf')
+    forward = graph.get_edge(v, w)
+    backward = graph.get_edge(w, v)
+    return (forward.element() if forward is not None else inf,
+            backward.element() if backward is not None else inf)
@@ -0,0 +1,840 @@
+'''
+Vertex, edge and graph classes.
+'''
+import gc
+import math
+
+# NumPy is optional, and only used to build graphs in bulk from arrays
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#Vertex, edge, and graph definitions
+class Vertex:
+    """ A Vertex in a graph.
+
+    Vertices use __slots__ rather than a __dict__ each, as a large map has
+    millions of them. They hash and compare equal by identity, so two
+    vertices with the same element are still different vertices; __lt__
+    orders them by element, to break ties in priority queues.
+    """
+
+    __slots__ = ('_element', '_coords')
+
+    def __init__(self, element, coords=None):
+        """ Create a vertex, with a data element.
+
+        Args:
+            element - the data or label to be associated with the vertex
+            coords - an optional (x, y) or (latitude, longitude) position
+        """
+        self._element = element
+        self._coords = coords
+
+    def __str__(self):
+        """ Return a string representation of the vertex. """
+        return str(self._element)
+
+    def __lt__(self, v):
+        """ Return true if this element is less than v's element.
+
+        Args:
+            v - a vertex object
+        """
+        return self._element < v.element()
+
+    def element(self):
+        """ Return the data for the vertex. """
+        return self._element
+
+    def coords(self):
+        """ Return the position of the vertex, or None if it has none. """
+        return self._coords
+
+class Edge:
+    """ An edge in a graph.
+
+        Implemented with an order, so can be used for directed or undirected
+        graphs. Methods are provided for both. It is the job of the Graph class
+        to handle them as directed or undirected.
+
+        Edges use __slots__, and keep the two vertices in their own slots
+        rather than in a tuple, which roughly halves the memory per edge.
+    """
+
+    __slots__ = ('_start', '_end', '_element', '_oneway')
+
+    def __init__(self, v, w, element, oneway=False):
+        """ Create an edge between vertices v and w, with a data element.
+
+        Element can be an arbitrarily complex structure.
+
+        Args:
+            element - the data or label to be associated with the edge.
+            oneway - True if the edge can only be followed from v to w
+        """
+        self._start = v
+        self._end = w
+        self._element = element
+        self._oneway = oneway
+
+    def __str__(self):
+        """ Return a string representation of this edge. """
+        return ('(' + str(self._start)
+                   + ('->' if self._oneway else '--')
+                   + str(self._end) + ' : '
+                   + str(self._element) + ')')
+
+    def vertices(self):
+        """ Return an ordered pair of the vertices of this edge. """
+        return (self._start, self._end)
+
+    def start(self):
+        """ Return the first vertex in the ordered pair. """
+        return self._start
+
+    def end(self):
+        """ Return the second vertex in the ordered pair. """
+        return self._end
+
+    def opposite(self, v):
+        """ Return the opposite vertex to v in this edge.
+
+        Args:
+            v - a vertex object
+        """
+        if self._start == v:
+            return self._end
+        elif self._end == v:
+            return self._start
+        else:
+            return None
+
+    def element(self):
+        """ Return the data element for this edge. """
+        return self._element
+
+    def is_oneway(self):
+        """ Return True if the edge can only be followed from start to end. """
+        return self._oneway
+
+class Graph:
+    """ Represent a simple graph.
+
+    Edges are undirected unless added as one-way, in which case they can
+    only be followed from their start to their end. Assumes no self loops.
+    """
+
+    #Implement as a Python dictionary
+    #  - the keys are the vertices
+    #  - the values are the sets of edges leaving the corresponding vertex.
+    #    Each edge set is also maintained as a dictionary,
+    #    with the opposite vertex as the key and the edge object as the value.
+    #
+    # A second dictionary of the same shape holds the edges entering each
+    # vertex, for searches that run backwards. Until the first one-way edge
+    # is added, the edges in and out are the same, so it is simply another
+    # name for the first dictionary.
+
+    def __init__(self):
+        """ Create an initial empty graph. """
+        self._structure = dict()
+        self._in_structure = self._structure
+        # Index from each label to the first vertex created with it, so
+        # that looking a vertex up by its label does not scan the graph.
+        self._labels = dict()
+        # Counts changes to the graph, so that anything computed from it
+        # (such as cached shortest paths) can tell when it is out of date.
+        self._version = 0
+        # Union-find forest of the components, from each vertex to its
+        # parent, once connected() or components() has been called. Edges
+        # are never removed (a replaced edge keeps the same two vertices),
+        # so components only ever merge, and add_vertex and add_edge keep
+        # the forest up to date as they go.
+        self._parents = None
+        # (version, component index) once components() has been called
+        self._components = None
+
+    def __str__(self):
+        """ Return a string representation of the graph. """
+        hstr = ('|V| = ' + str(self.num_vertices())
+                + '; |E| = ' + str(self.num_edges()))
+        # join the parts once, rather than growing a string one vertex
+        # or edge at a time
+        vstr = '\nVertices: ' + ''.join(str(v) + '-' for v in self._structure)
+        estr = '\nEdges: ' + ''.join(str(e) + ' ' for e in self.edges())
+        return hstr + vstr + estr
+
+    #-----------------------------------------------------------------------#
+
+    # ADT methods to query the graph
+
+    def num_vertices(self):
+        """ Return the number of vertices in the graph. """
+        return len(self._structure)
+
+    def num_edges(self):
+        """ Return the number of edges in the graph. """
+        num = 0
+        for v in self._structure:
+            for e in self._structure[v].values():
+                # each undirected edge appears in the list for both of its
+                # vertices, so only count it at its start
+                if e.start() == v:
+                    num += 1
+        return num
+
+    def vertices(self):
+        """ Return a list of all vertices in the graph. """
+        return [key for key in self._structure]
+
+    def get_vertex_by_label(self, element):
+        """ Return the first vertex that matches element. """
+        return self._labels.get(element)
+
+    def edges(self):
+        """ Return a list of all edges in the graph. """
+        edgelist = []
+        for v in self._structure:
+            for w in self._structure[v]:
+                #to avoid duplicates, only return if v is the first vertex
+                if self._structure[v][w].start() == v:
+                    edgelist.append(self._structure[v][w])
+        return edgelist
+
+    def get_edges(self, v):
+        """ Return a list of all edges that can be followed out of v.
+
+        These are all the edges incident on v, less any one-way edges
+        that end at v.
+
+        Args:
+            v - a vertex object
+        """
+        if v in self._structure:
+            return list(self._structure[v].values())
+        return None
+
+    def get_in_edges(self, v):
+        """ Return a list of all edges that can be followed into v.
+
+        Args:
+            v - a vertex object
+        """
+        if v in self._in_structure:
+            return list(self._in_structure[v].values())
+        return None
+
+    def get_edge(self, v, w):
+        """ Return the edge that can be followed from v to w, or None.
+
+        Args:
+            v - a vertex object
+            w - a vertex object
+        """
+        if (self._structure is not None
+                         and v in self._structure
+                         and w in self._structure[v]):
+            return self._structure[v][w]
+        return None
+
+    def degree(self, v):
+        """ Return the degree of vertex v (the number of edges out of v).
+
+        Args:
+            v - a vertex object
+        """
+        return len(self._structure[v])
+
+    def in_degree(self, v):
+        """ Return the number of edges into vertex v.
+
+        Args:
+            v - a vertex object
+        """
+        return len(self._in_structure[v])
+
+    def is_directed(self):
+        """ Return True if the graph has any one-way edges. """
+        return self._in_structure is not self._structure
+
+    def version(self):
+        """ Return a number that changes whenever the graph is changed. """
+        return self._version
+
+    #----------------------------------------------------------------------#
+
+    # ADT methods to modify the graph
+
+    def add_vertex(self, element, coords=None):
+        """ Add a new vertex with data element.
+
+        If there is already a vertex with the same data element,
+        this will create another vertex instance.
+
+        Args:
+            element - the data or label for the vertex
+            coords - an optional position for the vertex, used by A*
+        """
+        v = Vertex(element, coords)
+        self._structure[v] = dict()
+        if self._in_structure is not self._structure:
+            self._in_structure[v] = dict()
+        # only index the first vertex with this label
+        if element not in self._labels:
+            self._labels[element] = v
+        if self._parents is not None:
+            self._parents[v] = v
+        self._version += 1
+        return v
+
+    def add_vertex_if_new(self, element):
+        """ Add and return a vertex with element, if not already in graph.
+
+        Checks for equality between the elements. If there is special
+        meaning to parts of the element (e.g. element is a tuple, with an
+        'id' in cell 0), then this method may create multiple vertices with
+        the same 'id' if any other parts of element are different.
+
+        To ensure vertices are unique for individual parts of element,
+        separate methods need to be written.
+
+        """
+        v = self._labels.get(element)
+        if v is not None:
+            return v
+        return self.add_vertex(element)
+
+    def add_edge(self, v, w, element, oneway=False):
+        """ Add and return an edge between two vertices v and w, with  element.
+
+        If either v or w are not vertices in the graph, does not add, and
+        returns None.
+
+        If an edge already exists that can be followed in the same direction
+        as the new one, this will replace the previous edge.
+
+        Args:
+            v - a vertex object
+            w - a vertex object
+            element - a label
+            oneway - True if the edge can only be followed from v to w
+        """
+        if v not in self._structure or w not in self._structure:
+            return None
+        # remove any edge the new one replaces, in both of its directions
+        old = self._structure[v].get(w)
+        if old is not None:
+            self._remove_edge(old)
+        if not oneway:
+            old = self._structure[w].get(v)
+            if old is not None:
+                self._remove_edge(old)
+        if oneway and self._in_structure is self._structure:
+            # the first one-way edge, so the edges in now differ from out
+            self._in_structure = {x: dict(edges)
+                                  for x, edges in self._structure.items()}
+        e = Edge(v, w, element, oneway)
+        self._structure[v][w] = e
+        self._in_structure[w][v] = e
+        if not oneway:
+            self._structure[w][v] = e
+            self._in_structure[v][w] = e
+        if self._parents is not None:
+            self._union(v, w)
+        self._version += 1
+        return e
+
+    def update_weight(self, v, w, element):
+        """ Change the element (weight) of the edge from v to w, in place.
+
+        Returns the edge, or None if there is no edge from v to w.
+
+        Args:
+            v - a vertex object
+            w - a vertex object
+            element - the new element for the edge
+        """
+        e = self.get_edge(v, w)
+        if e is None:
+            return None
+        e._element = element
+        self._version += 1
+        # a new weight does not change which vertices are connected
+        if (self._components is not None
+                and self._components[0] == self._version - 1):
+            self._components = (self._version, self._components[1])
+        return e
+
+    def _remove_edge(self, e):
+        """ Remove edge e from the edges in and out of both its vertices.
+
+        Args:
+            e - an edge object in the graph
+        """
+        v, w = e.vertices()
+        for (x, y, structure) in ((v, w, self._structure),
+                                  (w, v, self._in_structure),
+                                  (w, v, self._structure),
+                                  (v, w, self._in_structure)):
+            if structure[x].get(y) is e:
+                del structure[x][y]
+
+    def add_edge_pairs(self, elist):
+        """ add all vertex pairs in elist as edges.
+
+        Args:
+            elist - a list of pairs of vertex objects, added with empty
+                    elements, or of (v, w, element) or
+                    (v, w, element, oneway) tuples
+        """
+        for edge in elist:
+            if len(edge) == 2:
+                self.add_edge(edge[0], edge[1], None)
+            else:
+                self.add_edge(*edge)
+
+    @classmethod
+    def from_arrays(cls, sources, targets, weights, oneway=None, labels=None,
+                    coords=None):
+        """ Return a graph built in bulk from parallel arrays of edges.
+
+        Edge i runs from the vertex labelled sources[i] to the one labelled
+        targets[i], with weights[i] as its element. The arrays can be lists
+        or NumPy arrays; with NumPy installed, relabelling and merging the
+        edges is done with array operations, then each vertex's edges are
+        filled in with one pass over the merged edges.
+
+        Parallel edges are merged, keeping the cheapest in each direction,
+        so the result is the graph add_edge would give if the cheapest
+        edges were added last. Edges from a vertex to itself are dropped.
+
+        Args:
+            sources - the label of the start vertex of each edge
+            targets - the label of the end vertex of each edge
+            weights - the weight of each edge
+            oneway - True for each edge that can only be followed from its
+                     start to its end (default: all edges are two-way)
+            labels - the labels of the vertices, in the order to create
+                     them (default: the labels in the edges, sorted)
+            coords - an optional dictionary from label to position
+        """
+        # Nothing made here is in a reference cycle, so pausing the cyclic
+        # garbage collector only stops it rescanning the growing graph.
+        paused = gc.isenabled()
+        gc.disable()
+        try:
+            if numpy is not None:
+                labels, starts, ends, lengths, oneways = _bulk_edges(
+                    sources, targets, weights, oneway, labels)
+            else:
+                labels, cheapest = _cheapest_arcs(sources, targets, weights,
+                                                  oneway, labels)
+            if coords is None:
+                vertices = [Vertex(label) for label in labels]
+            else:
+                vertices = [Vertex(label, coords.get(label))
+                            for label in labels]
+            if numpy is not None:
+                outs, ins = _bulk_adjacency_numpy(
+                    vertices, starts, ends, lengths, oneways,
+                    bool(oneways.any()))
+            else:
+                outs, ins = _bulk_adjacency(vertices, cheapest)
+            graph = cls()
+            graph._structure = dict(zip(vertices, outs))
+            if ins is not outs:
+                graph._in_structure = dict(zip(vertices, ins))
+            else:
+                graph._in_structure = graph._structure
+            graph._labels = dict(zip(labels, vertices))
+        finally:
+            if paused:
+                gc.enable()
+        graph._version += 1
+        return graph
+
+    #---------------------------------------------------------------------#
+
+    # Additional methods to explore the graph
+
+    def highestdegreevertex(self):
+        """ Return the vertex with highest degree. """
+        hd = -1
+        hdv = None
+        for v in self._structure:
+            if self.degree(v) > hd:
+                hd = self.degree(v)
+                hdv = v
+        return hdv
+
+    def depthfirstsearch(self, v):
+        """ Return a DFS tree from v.
+
+        Args:
+            v - a vertex object
+        """
+        marked = {v: None}
+        self._depthfirstsearch(v, marked)
+        return marked
+
+    def _depthfirstsearch(self, v, marked):
+        """ Do a DFS from v, storing nodes in a dictionary 'marked'.
+
+        The search keeps its own stack of (vertex, remaining edges), rather
+        than recursing, so it is not limited by Python's recursion limit on
+        large maps. It visits the vertices in the same order as recursing
+        would.
+
+        Args:
+            v - a vertex object
+            marked - a dictionary representing the DFS tree
+        """
+        stack = [(v, iter(self.get_edges(v)))]
+        while stack:
+            v, edges = stack[-1]
+            for e in edges:
+                w = e.opposite(v)
+                if w not in marked:
+                    marked[w] = e
+                    stack.append((w, iter(self.get_edges(w))))
+                    break
+            else:
+                stack.pop()
+
+    def breadthfirstsearch(self, v):
+        marked = {v:None}
+        level = [v]
+        while len(level) > 0:
+            nextlevel = []
+            for w in level:
+                edges = self.get_edges(w)
+                for e in edges:
+                    x = e.opposite(w)
+                    if x not in marked:
+                        marked[x] = e
+                        nextlevel.append(x)
+            level = nextlevel
+        return marked
+
+    def components(self):
+        """ Return a dictionary from each vertex to its component number.
+
+        Components are weakly connected: edge directions are ignored, so
+        vertices in different components can never reach each other. The
+        first call labels them with one iterative pass over the graph;
+        after that add_vertex and add_edge merge them as they go, and the
+        numbering is only worked out again from the merged components.
+        """
+        if self._components is None or self._components[0] != self._version:
+            parents = self._component_parents()
+            numbers = dict()
+            component = {v: numbers.setdefault(self._find(v), len(numbers))
+                         for v in parents}
+            self._components = (self._version, component)
+        return self._components[1]
+
+    def _component_parents(self):
+        """ Return the union-find forest of the components, labelling them
+        with a pass over the graph the first time.
+        """
+        if self._parents is None:
+            self._parents = self._label_components()
+        return self._parents
+
+    def _find(self, v):
+        """ Return the root of v's component in the union-find forest. """
+        parents = self._parents
+        while parents[v] is not v:
+            # point v at its grandparent as we go, halving the path
+            parents[v] = parents[parents[v]]
+            v = parents[v]
+        return v
+
+    def _union(self, v, w):
+        """ Merge the components of v and w in the union-find forest. """
+        v = self._find(v)
+        w = self._find(w)
+        if v is not w:
+            self._parents[w] = v
+
+    def _label_components(self):
+        """ Return a dictionary from each vertex to the first vertex found
+        in its component, which is the root of a union-find forest.
+        """
+        component = dict()
+        directed = self.is_directed()
+        for v in self._structure:
+            if v in component:
+                continue
+            component[v] = v
+            stack = [v]
+            while stack:
+                x = stack.pop()
+                if directed:
+                    neighbours = (self._structure[x], self._in_structure[x])
+                else:
+                    neighbours = (self._structure[x],)
+                for edges in neighbours:
+                    for y in edges:
+                        if y not in component:
+                            component[y] = v
+                            stack.append(y)
+        return component
+
+    def connected(self, v, w):
+        """ Return True if v and w are in the same component.
+
+        If this is False, there is no path between them. With one-way edges
+        there may still be none when it is True.
+
+        Args:
+            v - a vertex object
+            w - a vertex object
+        """
+        self._component_parents()
+        return self._find(v) is self._find(w)
+
+    def print_paths_and_distance(self, v):
+        """ Print the shortest path and its distance from v to every vertex.
+
+        Args:
+            v - a vertex object
+        """
+        # Imported here, as the search module itself builds on this one
+        from .search import Dijkstra, path_to
+        closed = Dijkstra(self, v)
+        for w in closed:
+            cost, path = path_to(closed, w)
+            print(' -> '.join(str(x) for x in path) + ' : ' + str(cost))
+
+    # End of class definition
+
+# Merging edge arrays for Graph.from_arrays (and CompactGraph.from_arrays)
+def _bulk_edges(sources, targets, weights, oneway=None, labels=None):
+    """ Return (labels, starts, ends, lengths, oneway) for bulk edges.
+
+    labels is a list, and the others are lists, or NumPy arrays if NumPy
+    is installed.
+
+    The vertices are numbered by the position of their label in the
+    returned labels, and the edges are given by these ids, grouped by
+    start. Parallel edges are merged, keeping the cheapest in each
+    direction: an edge that can be followed both ways at the same cost is
+    returned once, as two-way, and every other direction as a one-way edge.
+    Edges from a vertex to itself are dropped.
+
+    Raises ValueError if labels has duplicates, or if an edge refers to a
+    vertex that is not in labels.
+
+    Args:
+        see Graph.from_arrays
+    """
+    if numpy is not None:
+        return _bulk_edges_numpy(sources, targets, weights, oneway, labels)
+    labels, cheapest = _cheapest_arcs(sources, targets, weights, oneway,
+                                      labels)
+    starts, ends, lengths, oneways = [], [], [], []
+    for i, edges in enumerate(cheapest):
+        for j, weight in edges.items():
+            single = cheapest[j].get(i) != weight
+            if single or i < j:
+                starts.append(i)
+                ends.append(j)
+                lengths.append(weight)
+                oneways.append(single)
+    return labels, starts, ends, lengths, oneways
+
+def _cheapest_arcs(sources, targets, weights, oneway, labels):
+    """ Return (labels, cheapest), without NumPy, for bulk edges.
+
+    cheapest[i] is a dictionary from vertex id j to the cost of the
+    cheapest edge that can be followed from vertex i to vertex j.
+
+    Args:
+        see Graph.from_arrays
+    """
+    if labels is None:
+        labels = sorted(set(sources) | set(targets))
+    ids = dict()
+    for i, label in enumerate(labels):
+        if label in ids:
+            raise ValueError('duplicate vertex label %r' % (label,))
+        ids[label] = i
+    if oneway is None:
+        oneway = [False] * len(sources)
+    cheapest = [dict() for label in labels]
+    inf = math.inf
+    for s, t, weight, single in zip(sources, targets, weights, oneway):
+        try:
+            i = ids[s]
+            j = ids[t]
+        except KeyError:
+            raise ValueError('edge %r -> %r has an unknown vertex' % (s, t))
+        if i == j:
+            continue
+        weight = float(weight)
+        if weight < cheapest[i].get(j, inf):
+            cheapest[i][j] = weight
+        if not single and weight < cheapest[j].get(i, inf):
+            cheapest[j][i] = weight
+    return list(labels), cheapest
+
+def _bulk_edges_numpy(sources, targets, weights, oneway, labels):
+    """ _bulk_edges, with the relabelling and merging done by NumPy. """
+    s = numpy.asarray(sources)
+    t = numpy.asarray(targets)
+    weights = numpy.asarray(weights, dtype=numpy.float64)
+    if labels is None:
+        labels, ids = numpy.unique(numpy.concatenate((s, t)),
+                                   return_inverse=True)
+        i = ids[:len(s)]
+        j = ids[len(s):]
+    else:
+        labels = numpy.asarray(labels)
+        order = numpy.argsort(labels, kind='stable')
+        ordered = labels[order]
+        if len(ordered) and (ordered[1:] == ordered[:-1]).any():
+            duplicate = ordered[1:][ordered[1:] == ordered[:-1]]
+            raise ValueError('duplicate vertex label %r'
+                             % (duplicate[:1].tolist()[0],))
+        i = _label_positions(ordered, order, s, s, t)
+        j = _label_positions(ordered, order, t, s, t)
+    if oneway is None:
+        single = numpy.zeros(len(s), dtype=bool)
+    else:
+        single = numpy.asarray(oneway, dtype=bool)
+    # every direction each edge can be followed in, without self loops
+    both = ~single
+    starts = numpy.concatenate((i, j[both]))
+    ends = numpy.concatenate((j, i[both]))
+    lengths = numpy.concatenate((weights, weights[both]))
+    keep = starts != ends
+    starts, ends, lengths = starts[keep], ends[keep], lengths[keep]
+    # sort by (start, end, length), and keep the first (cheapest) of each;
+    # each (start, end) pair is one int64 key, which sorts faster
+    n = len(labels)
+    keys = starts.astype(numpy.int64) * n + ends
+    order = numpy.lexsort((lengths, keys))
+    keys, starts, ends, lengths = (keys[order], starts[order], ends[order],
+                                   lengths[order])
+    first = numpy.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    keys, starts, ends, lengths = (keys[first], starts[first], ends[first],
+                                   lengths[first])
+    # look up the opposite direction of each, to find the two-way edges
+    back = ends.astype(numpy.int64) * n + starts
+    pos = numpy.minimum(numpy.searchsorted(keys, back), max(len(keys) - 1, 0))
+    if len(keys):
+        paired = (keys[pos] == back) & (lengths[pos] == lengths)
+    else:
+        paired = numpy.zeros(0, dtype=bool)
+    keep = ~paired | (starts < ends)
+    return (labels.tolist(), starts[keep], ends[keep], lengths[keep],
+            ~paired[keep])
+
+def _bulk_adjacency(vertices, cheapest):
+    """ Return the (out, in) edge dictionaries of each vertex, for from_arrays.
+
+    in is the same list as out if no edge is one-way.
+
+    Args:
+        vertices - the vertices, in id order
+        cheapest - as returned by _cheapest_arcs
+    """
+    outs = [dict() for v in vertices]
+    ins = [dict() for v in vertices]
+    directed = False
+    for i, edges in enumerate(cheapest):
+        v = vertices[i]
+        out = outs[i]
+        for j, weight in edges.items():
+            w = vertices[j]
+            if cheapest[j].get(i) != weight:
+                e = Edge(v, w, weight, True)
+                out[w] = e
+                ins[j][v] = e
+                directed = True
+            elif i < j:
+                e = Edge(v, w, weight)
+                out[w] = e
+                outs[j][v] = e
+                ins[j][v] = e
+                ins[i][w] = e
+    return outs, (ins if directed else outs)
+
+def _bulk_arcs(n, starts, ends, oneways, by_end=False):
+    """ Return (bounds, others, edges) for merged edges, grouped by vertex.
+
+    Lists every direction each edge can be followed in, leaving each vertex
+    (or entering it, if by_end is True), as NumPy arrays: the directions at
+    vertex v are entries bounds[v] to bounds[v+1] of others, the vertex at
+    the other end, and edges, the index of the edge.
+
+    Args:
+        n - the number of vertices
+        starts, ends, oneways - the edges, as returned by _bulk_edges
+        by_end - True to group the directions by the vertex they enter
+    """
+    both = ~oneways
+    here = numpy.concatenate((starts, ends[both]))
+    there = numpy.concatenate((ends, starts[both]))
+    edges = numpy.concatenate((numpy.arange(len(starts)),
+                               numpy.flatnonzero(both)))
+    if by_end:
+        here, there = there, here
+    order = numpy.argsort(here, kind='stable')
+    bounds = numpy.zeros(n + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(here, minlength=n), out=bounds[1:])
+    return bounds, there[order], edges[order]
+
+def _bulk_adjacency_numpy(vertices, starts, ends, lengths, oneways, directed):
+    """ Return the (out, in) edge dictionaries of each vertex, for from_arrays.
+
+    The Edge objects are made in one pass, and each vertex's dictionary is
+    built whole from slices of arrays, rather than one item at a time.
+    """
+    n = len(vertices)
+    objects = numpy.empty(n, dtype=object)
+    objects[:] = vertices
+    edges = numpy.empty(len(starts), dtype=object)
+    edges[:] = list(map(Edge, objects[starts], objects[ends], lengths.tolist(),
+                        oneways.tolist()))
+    result = []
+    for by_end in (False, True) if directed else (False,):
+        bounds, others, ids = _bulk_arcs(n, starts, ends, oneways, by_end)
+        keys = objects[others].tolist()
+        values = edges[ids].tolist()
+        bounds = bounds.tolist()
+        result.append([dict(zip(keys[bounds[v]:bounds[v+1]],
+                                values[bounds[v]:bounds[v+1]]))
+                       for v in range(n)])
+    if not directed:
+        result.append(result[0])
+    return result[0], result[1]
+
+def _label_positions(ordered, order, labels, sources, targets):
+    """ Return the vertex id of each of labels, by binary search.
+
+    Raises ValueError, naming the edge, if one of labels is not a vertex.
+
+    Args:
+        ordered - the vertex labels, sorted
+        order - the vertex id of each label in ordered
+        labels - the labels to look up
+        sources - the labels the edges start at
+        targets - the labels the edges end at
+    """
+    pos = numpy.searchsorted(ordered, labels)
+    pos = numpy.minimum(pos, max(len(ordered) - 1, 0))
+    if len(ordered) == 0:
+        missing = numpy.ones(len(labels), dtype=bool)
+    else:
+        missing = ordered[pos] != labels
+    if missing.any():
+        k = numpy.flatnonzero(missing)[0]
+        raise ValueError('edge %r -> %r has an unknown vertex'
+                         % (sources[k:k+1].tolist()[0],
+                            targets[k:k+1].tolist()[0]))
+    return order[pos]
@@ -0,0 +1,261 @@
+'''
+ALT (A*, landmarks and the triangle inequality): lower bounds for A* from
+precomputed distances to a few landmark vertices, for graphs without
+coordinates.
+'''
+import random
+import sys
+from array import array
+
+from .compact import (_GRAPH_FILE_BIG_ENDIAN, _GRAPH_FILE_DIRECTED,
+                      _GRAPH_FILE_HEADER, _map_arrays, _open_binary_file)
+from .search import AStar, Dijkstra, path_to
+
+# Landmark distances, for A* on graphs without coordinates
+LANDMARK_FILE_MAGIC = b'DJLM'
+LANDMARK_FILE_VERSION = 1
+
+class LandmarkIndex:
+    """ Shortest path distances between every vertex and k landmarks.
+
+    By the triangle inequality, for any landmark L the cost of the shortest
+    path from v to t is at least d(L, t) - d(L, v) and at least
+    d(v, L) - d(t, L). The largest of these over the landmarks is a lower
+    bound that A* can use as its heuristic, and unlike the geometric
+    heuristics it needs no coordinates. It is consistent, so A* still
+    closes every vertex at its true cost.
+
+    Landmarks are chosen by farthest selection: each one is the vertex
+    furthest from the landmarks chosen so far, so they end up around the
+    edge of the map, where the bounds are tightest.
+
+    The distances are kept in flat arrays of k entries per vertex, in the
+    order of graph.vertices(), so the k distances of one vertex are next
+    to each other. For an undirected graph the distances to and from each
+    landmark are the same, and only one array is kept.
+    """
+
+    def __init__(self, graph, landmarks, dist_from, dist_to=None):
+        """ Create an index from its arrays.
+
+        Args:
+            graph - the Graph the distances were computed on
+            landmarks - an array of the vertex number (in graph.vertices()
+                        order) of each landmark
+            dist_from - an array of d(landmark, vertex), k per vertex
+            dist_to - an array of d(vertex, landmark), k per vertex, or
+                      None if the graph is undirected
+        """
+        self._graph = graph
+        self._version = graph.version()
+        self._landmarks = landmarks
+        self._ids = {v: i for i, v in enumerate(graph.vertices())}
+        self._from = dist_from
+        self._to = dist_from if dist_to is None else dist_to
+        # the distances of the last target, as heuristic is called with the
+        # same target over and over during a search
+        self._target = None
+        self._target_dists = None
+        self._mmap = None
+
+    @classmethod
+    def build(cls, graph, k=8, seed=0):
+        """ Return the landmark index of graph, with k landmarks.
+
+        Runs Dijkstra from each landmark, and also backwards to it if the
+        graph has one-way edges.
+
+        Args:
+            graph - a Graph whose edge elements are the edge weights
+            k - the number of landmarks. More landmarks give tighter bounds,
+                but take more memory and make each bound slower to work out.
+            seed - the random seed for the vertex that selection starts from
+        """
+        vertices = graph.vertices()
+        n = len(vertices)
+        k = min(k, n)
+        directed = graph.is_directed()
+        inf = float('inf')
+        dist_from = array('d', [inf]) * (n * k)
+        dist_to = array('d', [inf]) * (n * k) if directed else None
+        landmarks = array('q')
+        if n == 0:
+            return cls(graph, landmarks, dist_from, dist_to)
+        # landmarks are chosen in the component of a random start vertex,
+        # first the vertex furthest from it, then the vertex furthest from
+        # it and every landmark so far, and so on
+        start = vertices[random.Random(seed).randrange(n)]
+        components = graph.components()
+        candidates = [i for i, v in enumerate(vertices)
+                      if components[v] == components[start]]
+        nearest = _distances(graph, vertices, start, False)
+        for l in range(k):
+            best = max(candidates, key=nearest.__getitem__)
+            if l > 0 and nearest[best] == 0:
+                # every candidate is already a landmark
+                break
+            landmarks.append(best)
+            forward = _distances(graph, vertices, vertices[best], False)
+            dist_from[l::k] = array('d', forward)
+            if directed:
+                backward = _distances(graph, vertices, vertices[best], True)
+                dist_to[l::k] = array('d', backward)
+            for i in range(n):
+                if forward[i] < nearest[i]:
+                    nearest[i] = forward[i]
+        if len(landmarks) < k:
+            # drop the distances of the landmarks that were not needed
+            dist_from = _keep_columns(dist_from, k, len(landmarks))
+            if directed:
+                dist_to = _keep_columns(dist_to, k, len(landmarks))
+        return cls(graph, landmarks, dist_from, dist_to)
+
+    def save(self, filename):
+        """ Write the distances to filename, to be opened again with load.
+
+        Args:
+            filename - the name of the file to write. The vertex labels
+                       must be integers.
+        """
+        try:
+            labels = array('q', [v.element() for v in self._graph.vertices()])
+        except TypeError:
+            raise ValueError('binary landmark files need integer labels')
+        flags = _GRAPH_FILE_BIG_ENDIAN if sys.byteorder == 'big' else 0
+        if self._to is not self._from:
+            flags |= _GRAPH_FILE_DIRECTED
+        with open(filename, 'wb') as file:
+            file.write(_GRAPH_FILE_HEADER.pack(LANDMARK_FILE_MAGIC,
+                                               LANDMARK_FILE_VERSION, flags,
+                                               len(labels),
+                                               self.num_landmarks(), 0))
+            file.write(labels)
+            file.write(self._landmarks)
+            file.write(self._from)
+            if self._to is not self._from:
+                file.write(self._to)
+
+    @classmethod
+    def load(cls, filename, graph):
+        """ Return the index in filename, written by save, for graph.
+
+        The file is memory-mapped, like load_compact_graph. Its vertices
+        are matched to graph's by label, so graph must be the one the index
+        was built on, for example read again from the same map.
+
+        Args:
+            filename - the name of the file to open
+            graph - the Graph the index was built on
+        """
+        mapping, flags, n, k, _ = _open_binary_file(filename,
+                                                    LANDMARK_FILE_MAGIC,
+                                                    LANDMARK_FILE_VERSION)
+        layout = [('q', n), ('q', k), ('d', n * k)]
+        if flags & _GRAPH_FILE_DIRECTED:
+            layout.append(('d', n * k))
+        arrays = _map_arrays(mapping, layout)
+        labels = arrays[0]
+        vertices = graph.vertices()
+        if (len(vertices) != n
+                or any(v.element() != label
+                       for v, label in zip(vertices, labels))):
+            for buffer in arrays:
+                buffer.release()
+            mapping.close()
+            raise ValueError(filename + ' was not built on this graph')
+        index = cls(graph, *arrays[1:])
+        index._mmap = mapping
+        return index
+
+    def close(self):
+        """ Release the memory-mapped file behind the index, if any.
+
+        The index cannot be used after it is closed.
+        """
+        if self._mmap is not None:
+            for buffer in (self._landmarks, self._from, self._to):
+                buffer.release()
+            self._mmap.close()
+            self._mmap = None
+            self._target = None
+            self._target_dists = None
+
+    def num_landmarks(self):
+        """ Return the number of landmarks. """
+        return len(self._landmarks)
+
+    def landmarks(self):
+        """ Return the list of landmark vertices. """
+        vertices = self._graph.vertices()
+        return [vertices[i] for i in self._landmarks]
+
+    def heuristic(self, v, t):
+        """ Return a lower bound on the cost of the shortest path from v to t.
+
+        Can be given to AStar, or to shortest_path, as its heuristic.
+
+        Args:
+            v - a vertex object
+            t - a vertex object
+        """
+        if t is not self._target:
+            if self._graph.version() != self._version:
+                raise ValueError('the graph has changed since the landmark '
+                                 'distances were computed')
+            k = len(self._landmarks)
+            j = self._ids[t] * k
+            # copied out, as a slice of a memory-mapped array would keep the
+            # file from being closed
+            self._target_dists = (self._from[j:j+k].tolist(),
+                                  self._to[j:j+k].tolist())
+            self._target = t
+        k = len(self._landmarks)
+        i = self._ids[v] * k
+        from_v = self._from[i:i+k]
+        to_v = self._to[i:i+k]
+        from_t, to_t = self._target_dists
+        inf = float('inf')
+        bound = 0.0
+        for l in range(k):
+            # a difference is skipped when the distance taken away is inf,
+            # as it then says nothing; when only the other is inf, there
+            # is no path from v to t at all
+            if from_v[l] < inf and from_t[l] - from_v[l] > bound:
+                bound = from_t[l] - from_v[l]
+            if to_t[l] < inf and to_v[l] - to_t[l] > bound:
+                bound = to_v[l] - to_t[l]
+        return bound
+
+    def shortest_path(self, s, t, stats=None):
+        """ Return (cost, path) for the shortest path from vertex s to t.
+
+        Runs AStar with the landmark heuristic. path is the list of vertices
+        from s to t, or None (and cost is inf) if t cannot be reached.
+
+        Args:
+            s - the start vertex
+            t - the target vertex
+            stats - a SearchStats to add the search's counts to, or None
+        """
+        if not self._graph.connected(s, t):
+            return float('inf'), None
+        closed = AStar(self._graph, s, t, self.heuristic, stats)
+        return path_to(closed, t)
+
+def _distances(graph, vertices, source, reverse):
+    """ Return the list of Dijkstra distances from source to each vertex
+    (or to source, if reverse is True), inf where there is no path.
+    """
+    closed = Dijkstra(graph, source, reverse=reverse)
+    inf = float('inf')
+    return [closed[v][0] if v in closed else inf for v in vertices]
+
+def _keep_columns(dist, k, keep):
+    """ Return the flat array of k distances per vertex, with only the
+    first keep of each vertex's distances.
+    """
+    n = len(dist) // k
+    result = array('d', [0.0]) * (n * keep)
+    for l in range(keep):
+        result[l::keep] = dist[l::k]
+    return result
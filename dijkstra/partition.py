@@ -0,0 +1,379 @@
+'''
+Partitions of a graph into cells, with precomputed distances across each
+cell, for faster long queries.
+'''
+import heapq
+from array import array
+from collections import deque
+
+from .compact import CompactGraph
+
+# Partition of a graph into cells, with an overlay of boundary distances
+class GraphPartition:
+    """ A partition of a graph into cells, answering shortest path queries.
+
+    Preprocessing grows cells of about n/num_cells vertices each, by
+    breadth first search from a seed next to the cells already grown, so
+    cells are connected and compact. A vertex with an edge to or from
+    another cell is a boundary vertex. A Dijkstra search inside each cell
+    from each of its boundary vertices gives the distances across the cell
+    to its other boundary vertices, which become 'clique' edges. A clique
+    edge a->c is left out if a shortest path from a to c inside the cell
+    passes another boundary vertex b, as the edges a->b and b->c cover it.
+
+    A query from s to t follows the original edges in the cells of s and t
+    only. Everywhere else it visits only boundary vertices, following
+    clique edges across a cell and original edges between cells, so a long
+    query skips the inside of every cell it passes through.
+
+    Vertices are numbered as in the CompactGraph, and the overlay of
+    clique and cut edges is stored in flat arrays, in the same CSR form.
+    """
+
+    def __init__(self, graph, cells, num_cells, overlay_offsets,
+                 overlay_targets, overlay_weights):
+        """ Create a partition from its arrays.
+
+        Args:
+            graph - the CompactGraph that was partitioned
+            cells - an array of the cell number of each vertex id
+            num_cells - the number of cells
+            overlay_offsets, overlay_targets, overlay_weights - the CSR
+                arrays of the clique and cut edges leaving each boundary
+                vertex (other vertices have none)
+        """
+        self._graph = graph
+        self._cells = cells
+        self._num_cells = num_cells
+        self._overlay = (overlay_offsets, overlay_targets, overlay_weights)
+
+    @classmethod
+    def build(cls, graph, num_cells):
+        """ Return a partition of graph into about num_cells cells.
+
+        There can be a few more cells than asked for, when a cell cannot
+        grow to full size, for example in a small component.
+
+        Args:
+            graph - a Graph or CompactGraph
+            num_cells - the number of cells to aim for. More cells mean
+                        smaller cells to search at each end of a query,
+                        but more boundary vertices in between.
+        """
+        if not isinstance(graph, CompactGraph):
+            graph = CompactGraph.from_graph(graph)
+        cells, count = _grow_cells(graph, num_cells)
+        boundary = _boundary_vertices(graph, cells)
+        n = graph.num_vertices()
+        overlay = [None] * n
+        for v in range(n):
+            if not boundary[v]:
+                continue
+            edges = _cell_distances(graph, cells, boundary, v)
+            for (w, weight) in graph.neighbours(v):
+                if cells[w] != cells[v] and weight < edges.get(w, weight + 1):
+                    edges[w] = weight
+            overlay[v] = edges
+        offsets = array('q', [0]) * (n + 1)
+        targets = array('q')
+        weights = array('d')
+        for v, edges in enumerate(overlay):
+            if edges is not None:
+                targets.extend(edges.keys())
+                weights.extend(edges.values())
+            offsets[v+1] = len(targets)
+        return cls(graph, cells, count, offsets, targets, weights)
+
+    def num_cells(self):
+        """ Return the number of cells. """
+        return self._num_cells
+
+    def num_boundary_vertices(self):
+        """ Return the number of vertices with edges to or from other cells. """
+        offsets = self._overlay[0]
+        return sum(1 for v in range(len(offsets) - 1)
+                   if offsets[v+1] > offsets[v])
+
+    def cell(self, label):
+        """ Return the cell number of the vertex with label.
+
+        Raises KeyError if label is not in the graph.
+        """
+        return self._cells[self._vertex_ids(label)[0]]
+
+    def distance(self, s, t):
+        """ Return the cost of the shortest path between two labels, or inf.
+
+        Raises KeyError for a label that is not in the graph.
+
+        Args:
+            s - the label of the start vertex
+            t - the label of the target vertex
+        """
+        return self._query(*self._vertex_ids(s, t))[0]
+
+    def shortest_path(self, s, t):
+        """ Return (cost, path) for the shortest path between two labels.
+
+        path is the list of vertex labels from s to t, with every clique
+        edge unpacked into the original edges, or None (and cost is inf) if
+        t cannot be reached from s. Raises KeyError for a label that is not
+        in the graph.
+
+        Args:
+            s - the label of the start vertex
+            t - the label of the target vertex
+        """
+        graph = self._graph
+        s, t = self._vertex_ids(s, t)
+        cost, preds = self._query(s, t)
+        if preds is None:
+            return cost, None
+        path = [t]
+        w = t
+        local = (self._cells[s], self._cells[t])
+        while preds[w] is not None:
+            v = preds[w]
+            if self._cells[v] == self._cells[w] and self._cells[v] not in local:
+                # a clique edge, so find the path it stands for
+                path[0:0] = _cell_path(graph, self._cells, v, w)[:-1]
+            else:
+                path.insert(0, v)
+            w = v
+        return cost, [graph.label(v) for v in path]
+
+    def _vertex_ids(self, *labels):
+        """ Return the list of vertex ids of labels.
+
+        Raises KeyError if a label is not in the graph.
+        """
+        ids = []
+        for label in labels:
+            i = self._graph.vertex_id(label)
+            if i is None:
+                raise KeyError('no vertex %s' % label)
+            ids.append(i)
+        return ids
+
+    def _query(self, s, t):
+        """ Return (cost, predecessors) of the search between ids s and t.
+
+        predecessors is a dictionary of the vertex before each vertex
+        reached, or None (and cost is inf) if t cannot be reached.
+        """
+        graph = self._graph
+        if not graph.connected(s, t):
+            return float('inf'), None
+        cells = self._cells
+        local = (cells[s], cells[t])
+        edges = (graph._offsets, graph._targets, graph._weights)
+        dist = {s: 0.0}
+        preds = {s: None}
+        closed = set()
+        open = [(0.0, s)]
+        while open:
+            cost, v = heapq.heappop(open)
+            if v in closed:
+                continue
+            if v == t:
+                return cost, preds
+            closed.add(v)
+            # original edges in the end cells, the overlay everywhere else
+            if cells[v] == local[0] or cells[v] == local[1]:
+                offsets, targets, weights = edges
+            else:
+                offsets, targets, weights = self._overlay
+            for j in range(offsets[v], offsets[v+1]):
+                w = targets[j]
+                newcost = cost + weights[j]
+                if w not in dist or newcost < dist[w]:
+                    dist[w] = newcost
+                    preds[w] = v
+                    heapq.heappush(open, (newcost, w))
+        return float('inf'), None
+
+def _grow_cells(graph, num_cells):
+    """ Return (cells, count): the cell number of each vertex id, and the
+    number of cells, grown by breadth first search.
+
+    Each cell is seeded, where possible, from a vertex next to a cell that
+    is already full, so the cells grow outwards across the graph.
+
+    Args:
+        graph - a CompactGraph
+        num_cells - the number of cells to aim for
+    """
+    n = graph.num_vertices()
+    size = max(1, -(-n // max(1, num_cells)))
+    cells = array('q', [-1]) * n
+    arrays = [(graph._offsets, graph._targets)]
+    if graph.is_directed():
+        arrays.append((graph._in_offsets, graph._in_sources))
+    # vertices next to full cells, the preferred seeds for the next one
+    candidates = []
+    scan = 0
+    count = 0
+    while True:
+        seed = None
+        while candidates:
+            x = candidates.pop()
+            if cells[x] < 0:
+                seed = x
+                break
+        if seed is None:
+            while scan < n and cells[scan] >= 0:
+                scan += 1
+            if scan == n:
+                break
+            seed = scan
+        cells[seed] = count
+        grown = 1
+        queue = deque([seed])
+        while queue:
+            x = queue.popleft()
+            for offsets, ends in arrays:
+                for j in range(offsets[x], offsets[x+1]):
+                    y = ends[j]
+                    if cells[y] >= 0:
+                        continue
+                    if grown < size:
+                        cells[y] = count
+                        grown += 1
+                        queue.append(y)
+                    else:
+                        candidates.append(y)
+        count += 1
+    return _merge_small_cells(cells, count, size // 2, arrays)
+
+def _merge_small_cells(cells, count, smallest, arrays):
+    """ Return (cells, count), with cells of fewer than smallest vertices
+    merged into a neighbouring cell, and the cells numbered again.
+
+    Growing cells one after another leaves small pockets between them,
+    which would otherwise each be a cell of their own.
+
+    Args:
+        cells - the cell number of each vertex id
+        count - the number of cells
+        smallest - the fewest vertices a cell may keep on its own
+        arrays - the (offsets, ends) CSR arrays of the edges to follow
+    """
+    members = [[] for c in range(count)]
+    for v, c in enumerate(cells):
+        members[c].append(v)
+    for c in range(count):
+        if not members[c] or len(members[c]) >= smallest:
+            continue
+        # the first other cell found next to this one takes it over
+        other = None
+        for v in members[c]:
+            for offsets, ends in arrays:
+                for j in range(offsets[v], offsets[v+1]):
+                    if cells[ends[j]] != c:
+                        other = cells[ends[j]]
+                        break
+                if other is not None:
+                    break
+            if other is not None:
+                break
+        if other is None:
+            continue
+        for v in members[c]:
+            cells[v] = other
+        members[other].extend(members[c])
+        members[c] = []
+    numbers = dict()
+    for v, c in enumerate(cells):
+        cells[v] = numbers.setdefault(c, len(numbers))
+    return cells, len(numbers)
+
+def _boundary_vertices(graph, cells):
+    """ Return a bytearray, 1 for each vertex id with an edge to or from
+    another cell.
+    """
+    n = graph.num_vertices()
+    boundary = bytearray(n)
+    offsets, targets = graph._offsets, graph._targets
+    for v in range(n):
+        for j in range(offsets[v], offsets[v+1]):
+            w = targets[j]
+            if cells[w] != cells[v]:
+                # the edge is in v's edges out and w's edges in
+                boundary[v] = 1
+                boundary[w] = 1
+    return boundary
+
+def _cell_distances(graph, cells, boundary, a):
+    """ Return {boundary vertex: distance} for the clique edges out of a.
+
+    Runs Dijkstra from a, following only edges inside a's cell. Each
+    vertex records whether a shortest path to it passes another boundary
+    vertex (preferring one that does, on ties); a boundary vertex reached
+    that way needs no clique edge.
+
+    Args:
+        graph - a CompactGraph
+        cells - the cell number of each vertex id
+        boundary - 1 for each boundary vertex id
+        a - a boundary vertex id
+    """
+    cell = cells[a]
+    offsets, targets, weights = graph._offsets, graph._targets, graph._weights
+    dist = {a: 0.0}
+    via = {a: False}
+    closed = set()
+    open = [(0.0, a)]
+    edges = dict()
+    while open:
+        cost, v = heapq.heappop(open)
+        if v in closed:
+            continue
+        closed.add(v)
+        if boundary[v] and v != a:
+            if not via[v]:
+                edges[v] = cost
+            passes = True
+        else:
+            passes = via[v]
+        for j in range(offsets[v], offsets[v+1]):
+            w = targets[j]
+            if cells[w] != cell or w in closed:
+                continue
+            newcost = cost + weights[j]
+            if w not in dist or newcost < dist[w]:
+                dist[w] = newcost
+                via[w] = passes
+                heapq.heappush(open, (newcost, w))
+            elif newcost == dist[w] and passes:
+                via[w] = True
+    return edges
+
+def _cell_path(graph, cells, v, w):
+    """ Return the list of vertex ids on the shortest path from v to w that
+    stays inside their cell.
+    """
+    cell = cells[v]
+    offsets, targets, weights = graph._offsets, graph._targets, graph._weights
+    dist = {v: 0.0}
+    preds = {v: None}
+    closed = set()
+    open = [(0.0, v)]
+    while open:
+        cost, x = heapq.heappop(open)
+        if x in closed:
+            continue
+        if x == w:
+            break
+        closed.add(x)
+        for j in range(offsets[x], offsets[x+1]):
+            y = targets[j]
+            newcost = cost + weights[j]
+            if cells[y] == cell and (y not in dist or newcost < dist[y]):
+                dist[y] = newcost
+                preds[y] = x
+                heapq.heappush(open, (newcost, y))
+    path = [w]
+    while preds[path[-1]] is not None:
+        path.append(preds[path[-1]])
+    path.reverse()
+    return path
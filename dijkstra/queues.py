@@ -0,0 +1,364 @@
+'''
+Priority queues for the searches: the AdaptablePriorityQueue used by
+Dijkstra, and the alternative backends with a common interface.
+'''
+import heapq
+from array import array
+
+# Element class for the AdaptablePriorityQueue - yanked from slides
+class Element:
+    """ A key, value and index. """
+    # Slotted, as Dijkstra creates one element for every vertex it reaches
+    __slots__ = ('_key', '_value', '_index')
+    def __init__(self, k, v, i):
+        self._key = k
+        self._value = v
+        self._index = i
+    def __eq__(self, other):
+        return self._key == other._key
+    def __lt__(self, other):
+        return self._key < other._key
+    def _wipe(self):
+        self._key = None
+        self._value = None
+        self._index = None
+
+
+# AdaptablePriorityQueue Class, to be used in the Dijkstra's algorithm
+class AdaptablePriorityQueue:
+    # Element list constructor
+    def __init__(self, elemList):
+        self._elemList = elemList
+    # Empty list constructor
+    # If stats (a SearchStats) is given, the levels moved by bubbleup and
+    # bubbledown are added to its bubble_steps.
+    def __init__(self, stats=None):
+        self._elemList = []
+        self._stats = stats
+
+    # Add method, where we add a new item into the priority queue with priority key,
+    # and return its Element in the APQ
+    def add(self, key, item):
+        # create the Element with index of last place, add to heap
+        # and bubble up, changing indices of Elts, return the Element
+        endPos = len(self._elemList)
+        element = Element(key, item, endPos)
+        self._elemList.append(element)
+        self.bubbleup(endPos)
+        return element
+
+    # Min method
+    def min(self):
+        # read first cell in array and return
+        return self._elemList[0]
+
+    # Remove min
+    def remove_min(self):
+        # swap first element into last place
+        firstElement = self.min()
+        self._elemList[0] = self._elemList[len(self._elemList)-1]
+        self._elemList[len(self._elemList)-1] = firstElement
+        # the last element now sits at the root, so its index must follow it
+        self._elemList[0]._index = 0
+        # pop the element
+        self._elemList.pop()
+        # bubble top element down, changing indices (Done inside bubbledown)
+        self.bubbledown(0, len(self._elemList)-1)
+        #return popped key, value - the min element
+        return firstElement
+
+    # Get element method - used for debugging & methods
+    def get_element(self, element):
+        return self._elemList[element._index]
+
+    # Gets element with provided value
+    # Since the heap implementation puts elements not in order, linear search must be used.
+    def get_element_by_value(self, value):
+        for element in self._elemList:
+            if element._value == value:
+                return element
+        return -1
+
+    # Update key method
+    def update_key(self, element, newkey):
+        # update the element's key.
+        oldKey = element._key
+        element._key = newkey
+        # if only one element, no need for comparison
+        if len(self._elemList) != 1:
+            # if key less than parent's key bubble up
+            if newkey < oldKey:
+                self.bubbleup(element._index)
+            # else bubble down
+            else:
+                self.bubbledown(element._index, len(self._elemList)-1)
+
+    # Get key method
+    def get_key(self, element):
+        # return the element's key
+        return element._key
+
+    # Remove method
+    def remove(self, element):
+        # pop the last element, and move it into element's place
+        last = self._elemList.pop()
+        if last is not element:
+            i = element._index
+            self._elemList[i] = last
+            last._index = i
+            # if its key < parent's, bubble up
+            if i > 0 and last._key < self._elemList[(i-1) // 2]._key:
+                self.bubbleup(i)
+            # else bubble down
+            else:
+                self.bubbledown(i, len(self._elemList)-1)
+        return element._key, element._value
+
+    # Bubble up method - taken from the sorting solutions with slight modifications
+    # Used since the AdaptablePriorityQueue is supposed to be a heap implementation
+    def bubbleup(self, i):
+        """ Bubble up item currently in pos i in a min heap. """
+        # Rather than swapping at every level, parents are moved down into
+        # the gap until the right place is found, comparing keys directly.
+        heap = self._elemList
+        element = heap[i]
+        key = element._key
+        start = i
+        while i > 0:
+            parent = (i-1) // 2
+            if key < heap[parent]._key:
+                # Here is where the indices are changed for each bubbleup call
+                heap[i] = heap[parent]
+                heap[i]._index = i
+                i = parent
+            else:
+                break
+        heap[i] = element
+        element._index = i
+        if self._stats is not None:
+            # each level moved is one step, found from the depths of the
+            # start and end positions rather than counted in the loop
+            self._stats.bubble_steps += ((start+1).bit_length()
+                                         - (i+1).bit_length())
+
+    # Bubble up method - taken from the sorting solutions
+    # Again, used since the AdaptablePriorityQueue is supposed to be a heap implementation
+    def bubbledown(self, i, last):
+        """ Bubble down item currently in pos i in a min heap (stops at last). """
+        heap = self._elemList
+        if i > last:
+            return
+        element = heap[i]
+        key = element._key
+        start = i
+        while last > (i*2):  # so at least one child
+            lc = i*2 + 1
+            rc = i*2 + 2
+            minc = lc   # start by assuming left child is the min child
+            if last > lc and heap[rc]._key < heap[lc]._key:  # rc exists and is smaller
+                minc = rc
+            if key > heap[minc]._key:
+                # Here is where the indices are changed for each bubbledown call
+                heap[i] = heap[minc]
+                heap[i]._index = i
+                i = minc
+            else:
+                break
+        heap[i] = element
+        element._index = i
+        if self._stats is not None:
+            self._stats.bubble_steps += ((i+1).bit_length()
+                                         - (start+1).bit_length())
+
+#---------------------------------------------------------------------------#
+# Alternative priority queues for Dijkstra, with a common interface:
+#   push(item, key) - add item with key, or lower its key if it is already
+#                     in the queue with a higher one
+#   pop_min()       - remove and return (key, item) with the smallest key
+#   len(queue)      - the number of items in the queue
+# Items are small non-negative integers (vertex ids).
+
+class HeapqQueue:
+    """ A priority queue on the heapq module, with lazy deletion.
+
+    Lowering a key pushes a second entry for the item, and entries that no
+    longer hold the item's key are skipped when they reach the top. It uses
+    the C implementation of heapq, so is usually the fastest choice.
+    """
+
+    def __init__(self):
+        """ Create an empty queue. """
+        self._heap = []
+        self._keys = dict()
+
+    def __len__(self):
+        """ Return the number of items in the queue. """
+        return len(self._keys)
+
+    def push(self, item, key):
+        """ Add item with key, or lower its key if key is smaller. """
+        old = self._keys.get(item)
+        if old is None or key < old:
+            self._keys[item] = key
+            heapq.heappush(self._heap, (key, item))
+
+    def pop_min(self):
+        """ Remove and return (key, item) for the item with smallest key. """
+        while True:
+            key, item = heapq.heappop(self._heap)
+            if self._keys.get(item) == key:
+                del self._keys[item]
+                return key, item
+
+class DaryHeap:
+    """ An indexed d-ary min heap, stored in parallel arrays.
+
+    The items and keys in heap order are kept in two flat arrays, and a
+    third array holds the position of each item in the heap (or -1), so
+    keys are lowered in place and nothing is allocated per entry. A wider
+    heap (d of 4 or so) is shallower, so lowering keys costs fewer moves.
+    """
+
+    def __init__(self, d=4, capacity=0):
+        """ Create an empty heap.
+
+        Args:
+            d - the number of children of each node
+            capacity - the number of item ids to make room for up front
+        """
+        self._d = d
+        self._items = array('q')
+        self._keys = array('d')
+        self._pos = array('q', [-1]) * capacity
+
+    def __len__(self):
+        """ Return the number of items in the heap. """
+        return len(self._items)
+
+    def push(self, item, key):
+        """ Add item with key, or lower its key if key is smaller. """
+        pos = self._pos
+        if item >= len(pos):
+            pos.extend(array('q', [-1]) * max(item + 1 - len(pos), len(pos)))
+        i = pos[item]
+        if i < 0:
+            i = len(self._items)
+            self._items.append(item)
+            self._keys.append(key)
+            self._siftup(i, item, key)
+        elif key < self._keys[i]:
+            self._siftup(i, item, key)
+
+    def pop_min(self):
+        """ Remove and return (key, item) for the item with smallest key. """
+        items, keys = self._items, self._keys
+        item, key = items[0], keys[0]
+        self._pos[item] = -1
+        last, lastkey = items.pop(), keys.pop()
+        if items:
+            self._siftdown(0, last, lastkey)
+        return key, item
+
+    def _siftup(self, i, item, key):
+        """ Place item with key at position i, or above it if smaller. """
+        items, keys, pos, d = self._items, self._keys, self._pos, self._d
+        while i > 0:
+            parent = (i-1) // d
+            if keys[parent] <= key:
+                break
+            items[i] = items[parent]
+            keys[i] = keys[parent]
+            pos[items[i]] = i
+            i = parent
+        items[i] = item
+        keys[i] = key
+        pos[item] = i
+
+    def _siftdown(self, i, item, key):
+        """ Place item with key at position i, or below it if larger. """
+        items, keys, pos, d = self._items, self._keys, self._pos, self._d
+        n = len(items)
+        while True:
+            first = d*i + 1
+            if first >= n:
+                break
+            minc = first
+            for c in range(first + 1, min(first + d, n)):
+                if keys[c] < keys[minc]:
+                    minc = c
+            if keys[minc] >= key:
+                break
+            items[i] = items[minc]
+            keys[i] = keys[minc]
+            pos[items[i]] = i
+            i = minc
+        items[i] = item
+        keys[i] = key
+        pos[item] = i
+
+class BucketQueue:
+    """ A bucket queue for integer keys (Dial's algorithm).
+
+    Each key has a bucket of items, and the smallest key is found by
+    stepping up from the last one popped, so every operation is constant
+    time plus the total span of the keys. Keys must be whole numbers, and
+    no key may be pushed below the last key popped, which always holds in
+    Dijkstra with non-negative weights. Best when edge weights are small
+    integers.
+    """
+
+    def __init__(self):
+        """ Create an empty queue. """
+        self._buckets = dict()
+        self._keys = dict()
+        self._current = 0
+
+    def __len__(self):
+        """ Return the number of items in the queue. """
+        return len(self._keys)
+
+    def push(self, item, key):
+        """ Add item with key, or lower its key if key is smaller. """
+        if key != int(key):
+            raise ValueError('BucketQueue keys must be integers, not '
+                             + str(key))
+        old = self._keys.get(item)
+        if old is None or key < old:
+            self._keys[item] = key
+            self._buckets.setdefault(int(key), []).append(item)
+            if key < self._current:
+                self._current = int(key)
+
+    def pop_min(self):
+        """ Remove and return (key, item) for the item with smallest key. """
+        if not self._keys:
+            raise IndexError('pop from an empty BucketQueue')
+        while True:
+            bucket = self._buckets.get(self._current)
+            if not bucket:
+                self._buckets.pop(self._current, None)
+                self._current += 1
+                continue
+            item = bucket.pop()
+            # skip entries left behind when an item's key was lowered
+            key = self._keys.get(item)
+            if key is not None and key == self._current:
+                del self._keys[item]
+                return key, item
+
+QUEUE_BACKENDS = {'heapq': HeapqQueue, 'dary': DaryHeap,
+                  'bucket': BucketQueue}
+
+def make_queue(queue):
+    """ Return a new empty priority queue of the kind given.
+
+    Args:
+        queue - a name in QUEUE_BACKENDS, or a class (or other function)
+                returning a queue with push, pop_min and len
+    """
+    if isinstance(queue, str):
+        if queue not in QUEUE_BACKENDS:
+            raise ValueError('unknown queue backend ' + queue + ', not one of '
+                             + ', '.join(sorted(QUEUE_BACKENDS)))
+        queue = QUEUE_BACKENDS[queue]
+    return queue()
@@ -0,0 +1,102 @@
+'''
+Reading graphs from the route map file format.
+'''
+from .compact import CompactGraphBuilder
+from .graph import Graph
+
+# Streaming parser for the route map file format (Taken from Lab documentation)
+def read_graph_records(filename, chunk_size=1 << 20):
+    """ Generate the records in the route map in filename, in file order.
+
+    Each 'Node' record yields ('Node', id, coords), and each 'Edge' record
+    yields ('Edge', source id, target id, length, oneway). coords is (x, y)
+    if the node has 'x:' and 'y:' lines, (lat, lon) if it has 'lat:' and
+    'lon:' lines, or None. Lines are read about chunk_size bytes at a time,
+    so the whole file is never in memory.
+
+    Args:
+        filename - the name of a file of Node and Edge records
+        chunk_size - the approximate number of bytes to read at once
+    """
+    with open(filename, 'r') as file:
+        entry = None
+        fields = dict()
+        lines = file.readlines(chunk_size)
+        while lines:
+            for line in lines:
+                line = line.strip()
+                if line == 'Node' or line == 'Edge':
+                    if entry is not None:
+                        yield _make_record(entry, fields)
+                    entry = line
+                    fields = dict()
+                elif line:
+                    key, _, value = line.partition(':')
+                    fields[key.strip()] = value.strip()
+            lines = file.readlines(chunk_size)
+        if entry is not None:
+            yield _make_record(entry, fields)
+
+def _make_record(entry, fields):
+    """ Return the record tuple for the fields of one Node or Edge entry. """
+    if entry == 'Node':
+        if 'x' in fields and 'y' in fields:
+            coords = (float(fields['x']), float(fields['y']))
+        elif 'lat' in fields and 'lon' in fields:
+            coords = (float(fields['lat']), float(fields['lon']))
+        else:
+            coords = None
+        return ('Node', int(fields['id']), coords)
+    return ('Edge', int(fields['from']), int(fields['to']),
+            float(fields['length']), fields.get('oneway') == 'true')
+
+# Progress reporting function for graphreader
+def print_progress(vertices, edges):
+    """ Print how many vertices and edges have been read so far. """
+    print('... read %d vertices and %d edges' % (vertices, edges))
+
+# Graph reader function
+def graphreader(filename, compact=False, progress=print_progress,
+                progress_every=100000, verbose=True):
+    """ Read and return the route map in filename.
+
+    The file is parsed in a single streaming pass, so only the graph being
+    built is held in memory, not the file.
+
+    Args:
+        filename - the name of a file of Node and Edge records
+        compact - if True, return a CompactGraph instead of a Graph
+        progress - a function called as progress(vertices, edges) after
+                   every progress_every records, or None for no reports
+        progress_every - the number of records between progress calls
+        verbose - if True, print the numbers of vertices and edges read
+    """
+    if compact:
+        graph = CompactGraphBuilder()
+    else:
+        graph = Graph()
+    vertices = 0
+    edges = 0
+    for record in read_graph_records(filename):
+        if record[0] == 'Node':
+            vertices += 1
+            if compact:
+                graph.add_vertex(record[1])
+            else:
+                graph.add_vertex(record[1], record[2])
+        else:
+            edges += 1
+            if compact:
+                graph.add_edge(record[1], record[2], record[3], record[4])
+            else:
+                sv = graph.get_vertex_by_label(record[1])
+                tv = graph.get_vertex_by_label(record[2])
+                graph.add_edge(sv, tv, record[3], record[4])
+        if progress is not None and (vertices + edges) % progress_every == 0:
+            progress(vertices, edges)
+    if compact:
+        graph = graph.build()
+    if verbose:
+        print('Read', vertices, 'vertices and added into the graph')
+        print('Read', edges, 'edges and added into the graph')
+    return graph
@@ -0,0 +1,503 @@
+'''
+Dijkstra's algorithm and the point to point searches built on it.
+'''
+import math
+import time
+
+from .queues import AdaptablePriorityQueue, Element, make_queue
+
+# Instrumentation for the searches
+class SearchStats:
+    """ Counters and phase timings collected by searches that are given it.
+
+    Pass the same object to several searches to total them. Searches that
+    are not given one skip all the bookkeeping, so it costs nothing when
+    turned off; with it on, the counts are mostly worked out once per search
+    or per vertex, rather than per edge.
+
+    Counters:
+        searches - the number of searches run
+        settled - vertices closed
+        relaxed - edges examined out of closed vertices
+        pushes - vertices added to open
+        decrease_keys - lowered keys of vertices already in open
+        bubble_steps - levels moved in AdaptablePriorityQueue.bubbleup and
+                       bubbledown
+    phases holds the total seconds spent in each named phase, such as
+    'init', 'search' and 'path'.
+    """
+
+    def __init__(self, callback=None):
+        """ Create zeroed stats.
+
+        Args:
+            callback - a function called as callback(stats) at the end of
+                       every search, for logging or tracing
+        """
+        self._callback = callback
+        self.reset()
+
+    def __str__(self):
+        """ Return a one line summary of the counters and phases. """
+        return ', '.join('%s=%s' % item for item in self.as_dict().items())
+
+    def reset(self):
+        """ Set every counter and phase time back to zero. """
+        self.searches = 0
+        self.settled = 0
+        self.relaxed = 0
+        self.pushes = 0
+        self.decrease_keys = 0
+        self.bubble_steps = 0
+        self.phases = dict()
+
+    def add_time(self, phase, seconds):
+        """ Add seconds to the time spent in phase. """
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def finish(self):
+        """ Record the end of a search, and call the callback, if any. """
+        self.searches += 1
+        if self._callback is not None:
+            self._callback(self)
+
+    def as_dict(self):
+        """ Return the counters and phase times as a dictionary. """
+        counters = {'searches': self.searches, 'settled': self.settled,
+                    'relaxed': self.relaxed, 'pushes': self.pushes,
+                    'decrease_keys': self.decrease_keys,
+                    'bubble_steps': self.bubble_steps}
+        for phase, seconds in self.phases.items():
+            counters[phase + '_seconds'] = round(seconds, 9)
+        return counters
+
+#Djkstra's algorithm implementation (i)
+# Edges are followed in their own direction, or backwards if reverse is True,
+# which gives the shortest paths to startVertex rather than from it.
+# If a target vertex is given, the search stops as soon as it is closed.
+# By default open is an AdaptablePriorityQueue; queue can instead name one of
+# the QUEUE_BACKENDS (or give a queue class), see _dijkstra_with_queue.
+# If stats (a SearchStats) is given, the search's counts and times are added.
+def Dijkstra(graph, startVertex, reverse=False, target=None, queue=None,
+             stats=None):
+    if queue is not None:
+        return _dijkstra_with_queue(graph, startVertex, reverse, target,
+                                    make_queue(queue), stats)
+    if stats is not None:
+        begin = time.perf_counter()
+        relaxed = 0
+        decrease_keys = 0
+    # open starts as an empty APQ
+    open = AdaptablePriorityQueue(stats)
+    # locs is an empty dictionary (keys are vertices, values are location in open)
+    locs = dict()
+    # closed starts as an empty dictionary
+    closed = dict()
+    # preds starts as a dictionary with value for s = None
+    # s corresponds to startVertex in this case
+    preds = {startVertex:None}
+    # add s with APQ key 0 to open, and add s:(elt returned from APQ) to locs
+    startElement = open.add(0, startVertex)
+    locs[startVertex] = startElement
+    if stats is not None:
+        searching = time.perf_counter()
+        stats.add_time('init', searching - begin)
+    # while open is not empty
+    while not open._elemList == []:
+        # remove the min element v and its cost (key) from open
+        min = open.remove_min()
+        v = min._value
+        cost = min._key
+        # remove the entry for v from locs and preds (which returns predecessor)
+        rmminInLoc = locs.pop(v)
+        rmminInPred = preds.pop(v)
+        # add an entry for v:(cost, predecessor) into closed
+        closed[v] = (cost, rmminInPred)
+        # stop early if v is the only vertex we wanted
+        if v is target:
+            break
+        # for each edge e from v (or into v, when searching backwards)
+        if reverse:
+            edges = graph.get_in_edges(v)
+        else:
+            edges = graph.get_edges(v)
+        if stats is not None:
+            relaxed += len(edges)
+        for edge in edges:
+            # w is the opposite vertex to v in e
+            # w corresponds to opposVertex in this case
+            opposVertex = edge.opposite(v)
+            # if w is not in closed
+            if opposVertex not in closed:
+                # newcost is v's key plus e's cost
+                newcost = cost + edge._element
+                # w's element in open comes straight from locs, rather than
+                # searching the heap for it
+                opposVertex_element = locs.get(opposVertex)
+                # if w is not in locs i.e. not yet added into open
+                if opposVertex_element is None:
+                    # add w:v to preds, add w:newcost to open, add w:(elt returned from open) to locs
+                    preds[opposVertex] = min
+                    newElement = open.add(newcost, opposVertex)
+                    locs[opposVertex] = newElement
+                # else if newcost is better than w's oldcost
+                elif newcost < opposVertex_element._key:
+                    # update w:v in preds, update w's cost in open to newcost
+                    preds.update({opposVertex:min})
+                    open.update_key(opposVertex_element, newcost)
+                    if stats is not None:
+                        decrease_keys += 1
+    if stats is not None:
+        stats.add_time('search', time.perf_counter() - searching)
+        stats.settled += len(closed)
+        stats.relaxed += relaxed
+        # everything added to open was either closed or is still in it
+        stats.pushes += len(closed) + len(open._elemList)
+        stats.decrease_keys += decrease_keys
+        stats.finish()
+    return closed
+
+# A* search, Dijkstra's algorithm guided towards a target by a heuristic
+def AStar(graph, startVertex, targetVertex, heuristic, stats=None):
+    """ Return the closed dictionary of an A* search from start to target.
+
+    Works like Dijkstra, and closed has the same form, but vertices are
+    taken from open in order of cost plus heuristic(vertex, targetVertex),
+    an estimate of the remaining cost. The search stops when targetVertex
+    is closed. The heuristic must never overestimate the remaining cost,
+    and must be consistent (obey the triangle inequality), so that every
+    closed vertex has its true shortest path cost.
+
+    Args:
+        graph - a Graph whose edge elements are the edge weights
+        startVertex - the vertex to search from
+        targetVertex - the vertex to search towards
+        heuristic - a function of (vertex, target vertex) giving a lower
+                    bound on the cost of the path between them
+        stats - a SearchStats to add the search's counts to, or None
+    """
+    if stats is not None:
+        begin = time.perf_counter()
+        relaxed = 0
+        decrease_keys = 0
+    open = AdaptablePriorityQueue(stats)
+    locs = dict()
+    closed = dict()
+    preds = {startVertex:None}
+    # the keys in open are estimates, so the path costs are kept separately
+    costs = {startVertex:0}
+    locs[startVertex] = open.add(heuristic(startVertex, targetVertex),
+                                 startVertex)
+    while not open._elemList == []:
+        min = open.remove_min()
+        v = min._value
+        locs.pop(v)
+        cost = costs.pop(v)
+        closed[v] = (cost, preds.pop(v))
+        if v is targetVertex:
+            break
+        edges = graph.get_edges(v)
+        if stats is not None:
+            relaxed += len(edges)
+        for edge in edges:
+            w = edge.opposite(v)
+            if w not in closed:
+                newcost = cost + edge._element
+                w_element = locs.get(w)
+                if w_element is None:
+                    preds[w] = min
+                    costs[w] = newcost
+                    locs[w] = open.add(newcost + heuristic(w, targetVertex), w)
+                elif newcost < costs[w]:
+                    # the heuristic part of the key is unchanged
+                    preds[w] = min
+                    open.update_key(w_element,
+                                    w_element._key - costs[w] + newcost)
+                    costs[w] = newcost
+                    if stats is not None:
+                        decrease_keys += 1
+    if stats is not None:
+        stats.add_time('search', time.perf_counter() - begin)
+        stats.settled += len(closed)
+        stats.relaxed += relaxed
+        stats.pushes += len(closed) + len(open._elemList)
+        stats.decrease_keys += decrease_keys
+        stats.finish()
+    return closed
+
+# Heuristics for A*, using the coordinates of the vertices
+def euclidean_heuristic(v, w):
+    """ Return the straight line distance between vertices v and w.
+
+    Vertex coordinates are (x, y), in the same units as the edge lengths.
+    Returns 0 if either vertex has no coordinates.
+    """
+    a, b = v.coords(), w.coords()
+    if a is None or b is None:
+        return 0
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+EARTH_RADIUS = 6371008.8
+
+def haversine_heuristic(v, w):
+    """ Return the great circle distance in metres between vertices v and w.
+
+    Vertex coordinates are (latitude, longitude) in degrees, and edge
+    lengths must be in metres. Returns 0 if either vertex has no
+    coordinates.
+    """
+    a, b = v.coords(), w.coords()
+    if a is None or b is None:
+        return 0
+    lat1, lat2 = math.radians(a[0]), math.radians(b[0])
+    dlat = lat2 - lat1
+    dlon = math.radians(b[1] - a[1])
+    h = (math.sin(dlat / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2)
+    # shave a little off, so that rounding never makes it overestimate
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(h))) * 0.9999999
+
+# Bidirectional Dijkstra, searching forward from s and backward from t
+def BidirectionalDijkstra(graph, s, t, stats=None):
+    """ Return (cost, path) for the shortest path from vertex s to vertex t.
+
+    Runs one Dijkstra search forward from s and another backward from t,
+    each with its own AdaptablePriorityQueue, always advancing the side with
+    the cheaper open vertex. Whenever an edge joins the two searches, the
+    cost of the path through it is a candidate for the best path. Once the
+    smallest keys in the two open sets add up to at least the best candidate,
+    no shorter path can exist, so the search stops.
+
+    Returns (inf, None) if t cannot be reached from s.
+
+    Args:
+        graph - a Graph whose edge elements are the edge weights
+        s - the start vertex
+        t - the target vertex
+        stats - a SearchStats to add the search's counts to, or None
+    """
+    if s is t:
+        return 0, [s]
+    if stats is not None:
+        begin = time.perf_counter()
+        relaxed = 0
+        decrease_keys = 0
+    # index 0 is the forward search from s, index 1 the backward one from t
+    opens = (AdaptablePriorityQueue(stats), AdaptablePriorityQueue(stats))
+    locs = ({s: opens[0].add(0, s)}, {t: opens[1].add(0, t)})
+    closed = (dict(), dict())
+    preds = ({s: None}, {t: None})
+    best = float('inf')
+    meet = None
+    while opens[0]._elemList != [] and opens[1]._elemList != []:
+        top0 = opens[0].min()._key
+        top1 = opens[1].min()._key
+        if top0 + top1 >= best:
+            break
+        side = 0 if top0 <= top1 else 1
+        other = 1 - side
+        open = opens[side]
+        min = open.remove_min()
+        v = min._value
+        cost = min._key
+        locs[side].pop(v)
+        closed[side][v] = (cost, preds[side].pop(v))
+        if side == 0:
+            edges = graph.get_edges(v)
+        else:
+            edges = graph.get_in_edges(v)
+        if stats is not None:
+            relaxed += len(edges)
+        for edge in edges:
+            w = edge.opposite(v)
+            if w in closed[side]:
+                continue
+            newcost = cost + edge._element
+            w_element = locs[side].get(w)
+            if w_element is None:
+                preds[side][w] = min
+                locs[side][w] = open.add(newcost, w)
+            elif newcost < w_element._key:
+                preds[side][w] = min
+                open.update_key(w_element, newcost)
+                if stats is not None:
+                    decrease_keys += 1
+            # does the edge join this search to the other one?
+            if w in closed[other]:
+                othercost = closed[other][w][0]
+            elif w in locs[other]:
+                othercost = locs[other][w]._key
+            else:
+                continue
+            if newcost + othercost < best:
+                best = newcost + othercost
+                meet = (v, w) if side == 0 else (w, v)
+    if stats is not None:
+        settled = len(closed[0]) + len(closed[1])
+        stats.add_time('search', time.perf_counter() - begin)
+        stats.settled += settled
+        stats.relaxed += relaxed
+        stats.pushes += (settled + len(opens[0]._elemList)
+                         + len(opens[1]._elemList))
+        stats.decrease_keys += decrease_keys
+        stats.finish()
+    if meet is None:
+        return float('inf'), None
+    # walk back from the meeting edge to s, and forward from it to t
+    path = _pred_chain(closed[0], preds[0], meet[0])
+    path.reverse()
+    path += _pred_chain(closed[1], preds[1], meet[1])
+    return best, path
+
+def _pred_chain(closed, preds, v):
+    """ Return the list of vertices from v back to the root of a search.
+
+    Args:
+        closed - the closed dictionary of the search
+        preds - the predecessors of the vertices still open in the search
+        v - a vertex reached by the search
+    """
+    chain = [v]
+    pred = closed[v][1] if v in closed else preds[v]
+    while pred is not None:
+        v = pred._value
+        chain.append(v)
+        pred = closed[v][1]
+    return chain
+
+# Dijkstra's algorithm with one of the QUEUE_BACKENDS as open
+def _dijkstra_with_queue(graph, startVertex, reverse, target, open,
+                         stats=None):
+    """ Return Dijkstra's closed dictionary, using open as the open set.
+
+    The queue holds vertex ids, handed out as vertices are reached, rather
+    than the vertices themselves. An Element is only made for each vertex
+    as it is closed, to be its successors' predecessor in closed.
+
+    Args:
+        graph - a Graph whose edge elements are the edge weights
+        startVertex - the vertex to search from
+        reverse - if True, follow edges backwards
+        target - if not None, stop once this vertex is closed
+        open - an empty queue with push, pop_min and len
+        stats - a SearchStats to add the search's counts to, or None
+    """
+    if stats is not None:
+        begin = time.perf_counter()
+        relaxed = 0
+        decrease_keys = 0
+    closed = dict()
+    ids = {startVertex: 0}
+    vertices = [startVertex]
+    costs = [0]
+    preds = [None]
+    open.push(0, 0)
+    while len(open) > 0:
+        cost, i = open.pop_min()
+        v = vertices[i]
+        element = Element(cost, v, None)
+        closed[v] = (cost, preds[i])
+        if v is target:
+            break
+        if reverse:
+            edges = graph.get_in_edges(v)
+        else:
+            edges = graph.get_edges(v)
+        if stats is not None:
+            relaxed += len(edges)
+        for edge in edges:
+            w = edge.opposite(v)
+            if w in closed:
+                continue
+            newcost = cost + edge._element
+            j = ids.get(w)
+            if j is None:
+                j = len(vertices)
+                ids[w] = j
+                vertices.append(w)
+                costs.append(newcost)
+                preds.append(element)
+                open.push(j, newcost)
+            elif newcost < costs[j]:
+                costs[j] = newcost
+                preds[j] = element
+                open.push(j, newcost)
+                if stats is not None:
+                    decrease_keys += 1
+    if stats is not None:
+        stats.add_time('search', time.perf_counter() - begin)
+        stats.settled += len(closed)
+        stats.relaxed += relaxed
+        stats.pushes += len(vertices)
+        stats.decrease_keys += decrease_keys
+        stats.finish()
+    return closed
+
+# Point to point shortest path
+def shortest_path(graph, s, t, heuristic=None, bidirectional=False,
+                  stats=None):
+    """ Return (cost, path) for the shortest path from vertex s to vertex t.
+
+    path is the list of vertices from s to t, or None (and cost is inf) if
+    t cannot be reached from s. The search stops as soon as t is closed,
+    and only the path to t is rebuilt from the predecessors.
+
+    Args:
+        graph - a Graph whose edge elements are the edge weights
+        s - the start vertex
+        t - the target vertex
+        heuristic - if given, search with A* using this heuristic, such as
+                    euclidean_heuristic or haversine_heuristic
+        bidirectional - if True, use BidirectionalDijkstra
+        stats - a SearchStats to add the search's counts and times to
+    """
+    # vertices in different components cannot reach each other, so this
+    # saves searching the whole of s's component
+    if not graph.connected(s, t):
+        return float('inf'), None
+    if bidirectional:
+        return BidirectionalDijkstra(graph, s, t, stats)
+    if heuristic is not None:
+        closed = AStar(graph, s, t, heuristic, stats)
+    else:
+        closed = Dijkstra(graph, s, target=t, stats=stats)
+    if stats is None:
+        return path_to(closed, t)
+    begin = time.perf_counter()
+    result = path_to(closed, t)
+    stats.add_time('path', time.perf_counter() - begin)
+    return result
+
+# Path reconstruction from Dijkstra's closed dictionary
+def path_to(closed, t):
+    """ Return (cost, path) for vertex t from the closed result of Dijkstra.
+
+    Follows the predecessor of each vertex back from t to the start.
+    Returns (inf, None) if t was not closed.
+
+    Args:
+        closed - a dictionary returned by Dijkstra
+        t - a vertex object
+    """
+    if t not in closed:
+        return float('inf'), None
+    path = [t]
+    pred = closed[t][1]
+    while pred is not None:
+        path.append(pred._value)
+        pred = closed[pred._value][1]
+    path.reverse()
+    return closed[t][0], path
+
+# Path printing function
+def print_path(path):
+    #Iterating through the path
+    for key in path:
+        # print(key, path[key]) # -> 2 (3.0, <AdaptablePriorityQueue.Element object at 0x7f6bff599160>)
+        # Checking to see if we are at the start or not
+        if path[key][1] is not None:
+            # Printing the key vertex, cost of path, and previous vertex
+            print(str(key) + ' -> (' + str(path[key][0]) + ", " + str(path[key][1]._value) + ')')
+        else:
+            # Printing the starting vertex
+            print(str(key) + ' -> Starting Vertex')
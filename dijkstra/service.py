@@ -0,0 +1,306 @@
+'''
+Asyncio routing service, batching point to point queries by source.
+'''
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .compact import CompactGraph, compact_dijkstra, compact_path, \
+    load_compact_graph
+
+# Asyncio routing service, batching point to point queries by source
+
+# The graphs of the services using the current worker process, by key (the
+# file name of a memory-mapped graph), so that a search is sent only its
+# source and targets rather than the graph
+_worker_graphs = dict()
+
+def _init_service_worker(key, graph):
+    """ Keep graph as the graph with key in this worker process. """
+    _worker_graphs[key] = graph
+
+def _route_in_worker(key, source, targets):
+    """ Return _route_from_source on the worker's graph with key.
+
+    A key not seen before in this worker is the file name of a graph
+    written by save_compact_graph, which is opened once and kept.
+    """
+    graph = _worker_graphs.get(key)
+    if graph is None:
+        graph = load_compact_graph(key)
+        _worker_graphs[key] = graph
+    return _route_from_source(graph, source, targets)
+
+def _route_from_source(graph, source, targets):
+    """ Return {target: (cost, path)} for one search from source.
+
+    Runs in the service's executor, so it is a plain module function that
+    can be sent to a process pool. The search stops once every target is
+    closed. Labels that are not in the graph get (inf, None).
+
+    Args:
+        graph - a CompactGraph
+        source - the label of the start vertex
+        targets - the labels of the target vertices
+    """
+    results = dict()
+    s = graph.vertex_id(source)
+    ids = dict()
+    for t in targets:
+        i = graph.vertex_id(t)
+        if s is None or i is None:
+            results[t] = (float('inf'), None)
+        else:
+            ids[t] = i
+    if ids:
+        dist, preds = compact_dijkstra(graph, s, targets=ids.values())
+        for t, i in ids.items():
+            path = compact_path(dist, preds, i)
+            results[t] = (dist[i], [graph.label(v) for v in path]
+                          if path is not None else None)
+    return results
+
+class RoutingService:
+    """ Answers shortest path queries from asyncio code without blocking it.
+
+    Queries go onto a queue. A background task collects them for a short
+    window, groups them by source, and runs one search per source in an
+    executor, for all of that source's targets at once, then hands each
+    query its answer. Each search is a task of its own, so the collector
+    goes straight back to the queue, and a slow search only holds up its
+    own queries; at most max_searches of them run at once. Each query may
+    have a deadline, after which it fails with asyncio.TimeoutError;
+    queries that expire while still queued, or while their search waits
+    for its turn, are dropped before the search starts.
+
+    The graph is frozen into a CompactGraph when the service is created.
+    The default executor is a thread pool, which keeps the event loop free,
+    but the searches still share the GIL. For searches in parallel, give
+    processes, and the service starts its own pool of worker processes,
+    handing each the graph once as it starts. A ProcessPoolExecutor of
+    your own also works with a graph opened with load_compact_graph: each
+    worker opens the file the first time, and after that a search is sent
+    only its file name (any other graph is sent with every search).
+    """
+
+    def __init__(self, graph, executor=None, batch_window=0.002,
+                 max_batch=1024, timeout=None, max_searches=None,
+                 processes=None):
+        """ Create a service for graph. Call start() (or use 'async with').
+
+        Args:
+            graph - a Graph or CompactGraph
+            executor - a concurrent.futures executor for the searches, or
+                       None for the event loop's default executor
+            batch_window - the seconds to wait for more queries after the
+                           first, so that they can share searches
+            max_batch - the most queries to take in one batch
+            timeout - the default deadline in seconds for each query, or
+                      None for no deadline
+            max_searches - the most searches to run at once (default: the
+                           number of workers in the executor)
+            processes - if given, run the searches in a pool of this many
+                        worker processes, started and stopped with the
+                        service, instead of in executor
+        """
+        if not isinstance(graph, CompactGraph):
+            graph = CompactGraph.from_graph(graph)
+        if processes is not None and executor is not None:
+            raise ValueError('give either executor or processes, not both')
+        self._graph = graph
+        self._executor = executor
+        self._processes = processes
+        # the key of the graph in the worker processes, or None to send
+        # the graph itself with each search (as to a thread pool)
+        if processes is not None:
+            self._graph_key = graph._filename or 'service-%d' % id(self)
+            if max_searches is None:
+                max_searches = processes
+        elif (isinstance(executor, ProcessPoolExecutor)
+                and graph._filename is not None):
+            self._graph_key = graph._filename
+        else:
+            self._graph_key = None
+        self._batch_window = batch_window
+        self._max_batch = max_batch
+        self._timeout = timeout
+        if max_searches is None:
+            # ThreadPoolExecutor and ProcessPoolExecutor both keep their
+            # size here; the loop's default executor is a ThreadPoolExecutor
+            # of the default size
+            max_searches = getattr(executor, '_max_workers',
+                                   min(32, (os.cpu_count() or 1) + 4))
+        self._max_searches = max_searches
+        self._queue = None
+        self._task = None
+        self._slots = None
+        # the search tasks still running, so that stop() can cancel them
+        self._searches = set()
+        self.requests = 0
+        self.searches = 0
+        self.batches = 0
+        self.timeouts = 0
+
+    async def start(self):
+        """ Start the background task that answers queries. """
+        if self._task is None:
+            if self._processes is not None:
+                self._executor = ProcessPoolExecutor(
+                    self._processes, initializer=_init_service_worker,
+                    initargs=(self._graph_key, self._graph))
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self._max_searches)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """ Stop answering queries, failing any that are still queued. """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            for task in list(self._searches):
+                task.cancel()
+            if self._searches:
+                await asyncio.gather(*self._searches, return_exceptions=True)
+            while not self._queue.empty():
+                _, _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
+            if self._processes is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    async def __aenter__(self):
+        """ Start the service, for use in an 'async with' block. """
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        """ Stop the service at the end of an 'async with' block. """
+        await self.stop()
+
+    async def route(self, source, target, timeout=None):
+        """ Return (cost, path) for the shortest path between two labels.
+
+        path is the list of labels from source to target, or None (and cost
+        is inf) if there is no path.
+
+        Args:
+            source - the label of the start vertex
+            target - the label of the target vertex
+            timeout - the deadline in seconds for this query, overriding
+                      the service's default
+        """
+        if self._task is None:
+            raise RuntimeError('RoutingService has not been started')
+        if timeout is None:
+            timeout = self._timeout
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        deadline = loop.time() + timeout if timeout is not None else None
+        self.requests += 1
+        self._queue.put_nowait((source, target, future, deadline))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+    def stats(self):
+        """ Return a dictionary of the service's counters. """
+        return {'requests': self.requests, 'searches': self.searches,
+                'batches': self.batches, 'timeouts': self.timeouts}
+
+    async def _run(self):
+        """ Take batches of queries off the queue and answer them. """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                end = loop.time() + self._batch_window
+                while len(batch) < self._max_batch:
+                    remaining = end - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(
+                            self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # stopped while collecting: the queries already taken off
+                # the queue are in no search, so fail them here rather than
+                # leave them waiting forever
+                for (source, target, future, deadline) in batch:
+                    future.cancel()
+                raise
+            self.batches += 1
+            # group the live queries by source
+            now = loop.time()
+            sources = dict()
+            for (source, target, future, deadline) in batch:
+                if future.done() or (deadline is not None and deadline < now):
+                    continue
+                sources.setdefault(source, []).append((target, future))
+            # start each search as a task of its own, and go straight back
+            # to collecting rather than waiting for them to finish
+            for source, queries in sources.items():
+                task = loop.create_task(self._search(loop, source, queries))
+                self._searches.add(task)
+                task.add_done_callback(self._searches.discard)
+
+    async def _search(self, loop, source, queries):
+        """ Run one search for a source and answer all its queries. """
+        try:
+            async with self._slots:
+                # drop the queries that expired while waiting for a slot
+                queries = [(target, future) for (target, future) in queries
+                           if not future.done()]
+                if not queries:
+                    return
+                self.searches += 1
+                targets = list({target for (target, future) in queries})
+                if self._graph_key is None:
+                    results = await loop.run_in_executor(
+                        self._executor, _route_from_source, self._graph,
+                        source, targets)
+                else:
+                    results = await loop.run_in_executor(
+                        self._executor, _route_in_worker, self._graph_key,
+                        source, targets)
+        except asyncio.CancelledError:
+            for (target, future) in queries:
+                future.cancel()
+            raise
+        except Exception as error:
+            for (target, future) in queries:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (target, future) in queries:
+            if not future.done():
+                future.set_result(results[target])
+
+class RoutingClient:
+    """ An in-process client for a RoutingService, for tests and demos. """
+
+    def __init__(self, service):
+        """ Create a client of service, which must be started. """
+        self._service = service
+
+    async def query(self, source, target, timeout=None):
+        """ Return (cost, path) for one query, as RoutingService.route. """
+        return await self._service.route(source, target, timeout)
+
+    async def query_many(self, pairs, timeout=None):
+        """ Send all the (source, target) pairs at once, and return the
+        list of their answers, in order. A query that times out has the
+        exception in its place rather than an answer.
+        """
+        return await asyncio.gather(
+            *[self._service.route(s, t, timeout) for (s, t) in pairs],
+            return_exceptions=True)